@@ -1,6 +1,7 @@
 # File: main.py
 import database.create
 import database.populate
+import instrumentacao
 import time
 
 def main():
@@ -12,7 +13,8 @@ def main():
     # --- Passo 1: Criar as tabelas ---
     print("\nIniciando a criação das tabelas...")
     start_time_create = time.time()
-    database.create.create_tables()
+    with instrumentacao.span('create_tables'):
+        database.create.create_tables()
     end_time_create = time.time()
     elapsed_time_create = end_time_create - start_time_create
     print(f"Criação de tabelas concluída em {elapsed_time_create:.2f} segundos.")
@@ -22,7 +24,8 @@ def main():
     # --- Passo 2: Popular as tabelas com os dados das planilhas ---
     print("\nIniciando a população das tabelas com os dados das planilhas...")
     start_time_populate = time.time()
-    database.populate.populate_tables()
+    with instrumentacao.span('populate_tables'):
+        database.populate.populate_tables()
     end_time_populate = time.time()
     elapsed_time_populate = end_time_populate - start_time_populate
     print(f"\nPopulação das tabelas concluída em {elapsed_time_populate:.2f} segundos.")
@@ -31,4 +34,6 @@ def main():
     print("Processo concluído com sucesso!")
 
 if __name__ == "__main__":
-    main()
+    # VR_METRICAS e VR_PERFIL ativam a coleta de métricas (ver instrumentacao.py)
+    with instrumentacao.do_ambiente():
+        main()
@@ -1,54 +1,51 @@
 import sqlite3
 
+import instrumentacao
+from database.connection import connect
+from database.reference import apply_corrections
+
 
 db_path = './database/bd.sqlite'
 
-# Mapeia os estados e os novos valores/sindicatos
-updates = {
-    'Paraná': {
-        'VALOR': 'R$ 35,00',
-        'Sindicato': 'SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA'
-    },
-    'Rio de Janeiro': {
-        'VALOR': 'R$ 35,00',
-        'Sindicato': 'SINDPD RJ - SINDICATO PROFISSIONAIS DE PROC DADOS DO RIO DE JANEIRO'
-    },
-    'Rio Grande do Sul': {
-        'VALOR': 'R$ 35,00',
-        'Sindicato': 'SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL'
-    },
-    'São Paulo': {
-        'VALOR': 'R$ 37,50',
-        'Sindicato': 'SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.'
-    }
-}
-
-try:
-    # Conecta ao banco de dados SQLite
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    print("Conexão com o banco de dados bem-sucedida!")
-    print("Iniciando a atualização dos dados...")
-
-    # Itera sobre o dicionário de atualizações e executa o UPDATE
-    for estado, dados in updates.items():
-        # Utiliza uma consulta parametrizada para evitar SQL Injection
-        sql_query = """
-            UPDATE base_sindicato_valor
-            SET VALOR = ?, Sindicato = ?
-            WHERE ESTADO = ?;
-        """
-        cursor.execute(sql_query, (dados['VALOR'], dados['Sindicato'], estado))
-        print(f"Atualizado o estado: {estado}")
-
-    # Confirma as alterações no banco de dados
-    conn.commit()
-    print("\nTodos os registros foram atualizados com sucesso!")
-
-except sqlite3.Error as e:
-    print(f"Erro ao conectar ou atualizar o banco de dados: {e}")
-finally:
-    # Fecha a conexão com o banco de dados
-    if conn:
-        conn.close()
-        print("Conexão com o banco de dados fechada.")
+# As correções de valor e sindicato por estado ficam no arquivo de referência
+# database/referencias/base_sindicato_valor.csv (ver database/reference.py)
+
+def corrigir_base_sindicato(arquivo=None):
+    """
+    Corrige valores e sindicatos da tabela base_sindicato_valor por estado.
+
+    As correções vêm de `arquivo` (padrão: o arquivo de referência da
+    tabela) e são gravadas em um único upsert pelo estado, com o valor em
+    centavos inteiros.
+    """
+    conn = None
+    try:
+        # Conecta ao banco de dados SQLite
+        conn = connect(db_path)
+        print("Conexão com o banco de dados bem-sucedida!")
+        print("Iniciando a atualização dos dados...")
+
+        correcoes = apply_corrections(conn, 'base_sindicato_valor', arquivo)
+        atualizados = len(correcoes)
+        for estado in correcoes['estado']:
+            print(f"Atualizado o estado: {estado}")
+
+        # Confirma as alterações no banco de dados
+        conn.commit()
+        instrumentacao.registrar(linhas_saida=atualizados)
+        print("\nTodos os registros foram atualizados com sucesso!")
+
+    except sqlite3.Error as e:
+        print(f"Erro ao conectar ou atualizar o banco de dados: {e}")
+    except (OSError, ValueError) as e:
+        print(f"Erro ao ler o arquivo de correções: {e}")
+    finally:
+        # Fecha a conexão com o banco de dados
+        if conn:
+            conn.close()
+            print("Conexão com o banco de dados fechada.")
+
+if __name__ == "__main__":
+    # VR_METRICAS e VR_PERFIL ativam a coleta de métricas (ver instrumentacao.py)
+    with instrumentacao.do_ambiente(), instrumentacao.span('corrigir_base_sindicato'):
+        corrigir_base_sindicato()
@@ -2,16 +2,120 @@ import sqlite3
 import pandas as pd
 import os
 
+import instrumentacao
+from calculo.elegibilidade import MotorExclusao, consulta_exclusoes_sql, contar_exclusoes_sql
+from calculo.tipos import DicionarioCategorias, compactar
+from database.connection import connect
+
 # --- Configuração ---
 # O caminho para o seu banco de dados
 DB_PATH = "./database/bd.sqlite"
-# O nome do arquivo de saída para a base consolidada
+# Tabela em que a base consolidada é materializada para a Etapa 4
+OUTPUT_TABLE = "colaboradores_elegiveis"
+# Exportação opcional em CSV da base consolidada (fora do caminho crítico)
 OUTPUT_PATH = "./dados_consolidados_e_filtrados.csv"
 
-def consolidar_e_filtrar_dados():
+# Consulta que aplica as regras de exclusão diretamente no SQLite. As
+# tabelas de exclusão são consultadas pela chave primária (matricula), então
+# só as linhas elegíveis chegam ao pandas. As condições vêm das mesmas regras
+# do modo pandas (calculo/elegibilidade.py).
+CONSULTA_ELEGIVEIS = """
+    SELECT
+        TRIM(a.matricula) AS matricula,
+        a.empresa,
+        a.titulo_do_cargo,
+        a.desc_situacao,
+        TRIM(a.sindicato) AS sindicato,
+        s.estado,
+        s.valor_centavos,
+        d.dias_uteis
+    FROM ativos a
+    LEFT JOIN base_sindicato_valor s ON s.sindicato = TRIM(a.sindicato)
+    LEFT JOIN base_dias_uteis d ON d.sindicato = TRIM(a.sindicato)
+    WHERE {exclusoes}
+    ORDER BY a.rowid
+""".format(exclusoes=consulta_exclusoes_sql())
+
+def consolidar_sql(conn):
+    """
+    Consolida e filtra os colaboradores elegíveis com uma única consulta SQL,
+    gravando o resultado direto na tabela de saída. Retorna a base
+    consolidada e o número de colaboradores excluídos por regra.
+    """
+    total_ativos = conn.execute("SELECT COUNT(*) FROM ativos").fetchone()[0]
+    print(f"Tabela 'ativos' com {total_ativos} linhas.")
+    with conn:
+        conn.execute(f"DELETE FROM {OUTPUT_TABLE}")
+        conn.execute(f"INSERT INTO {OUTPUT_TABLE} {CONSULTA_ELEGIVEIS}")
+    exclusoes = contar_exclusoes_sql(conn)
+    return pd.read_sql_query(f"SELECT * FROM {OUTPUT_TABLE} ORDER BY rowid", conn), exclusoes
+
+def consolidar_pandas(conn, tabelas=None):
+    """
+    Consolida e filtra os colaboradores elegíveis carregando as tabelas no pandas.
+
+    `tabelas` é um cache opcional (pipeline.TabelaCache) com as tabelas já
+    carregadas e com as chaves normalizadas. Retorna a base consolidada e o
+    número de colaboradores excluídos por regra.
+    """
+    motor = MotorExclusao()
+
+    # --- 1. Carregar as tabelas para a memória ---
+    if tabelas is not None:
+        ativos = tabelas.get('ativos')
+        print(f"Tabela 'ativos' obtida do cache. Linhas: {len(ativos)}")
+
+        exclusao = {tabela: tabelas.get(tabela)[['matricula']] for tabela in motor.tabelas()}
+        base_sindicato = tabelas.get('base_sindicato_valor')
+        base_dias_uteis = tabelas.get('base_dias_uteis')
+    else:
+        ativos = pd.read_sql_query("SELECT * FROM ativos", conn)
+        print(f"Tabela 'ativos' carregada. Linhas: {len(ativos)}")
+
+        exclusao = {tabela: pd.read_sql_query(f"SELECT matricula FROM {tabela}", conn) for tabela in motor.tabelas()}
+        base_sindicato = pd.read_sql_query("SELECT * FROM base_sindicato_valor", conn)
+        base_dias_uteis = pd.read_sql_query("SELECT * FROM base_dias_uteis", conn)
+        
+        # Matrícula inteira e sindicato como categoria, com um dicionário
+        # comum às tabelas, para que as junções comparem códigos
+        categorias = DicionarioCategorias()
+        for df in (ativos, *exclusao.values(), base_sindicato, base_dias_uteis):
+            compactar(df, categorias)
+
+
+    # --- 2. Juntar as tabelas para consolidar os dados ---
+    # Juntando as bases de sindicato e dias úteis com a base de ativos
+    df_consolidado = pd.merge(ativos, base_sindicato, on='sindicato', how='left')
+    
+    # CORREÇÃO: Adicionar um sufixo para evitar conflito de nomes e garantir a união
+    df_consolidado = pd.merge(df_consolidado, base_dias_uteis, on='sindicato', how='left', suffixes=('', '_dias_uteis_bd'))
+
+    # --- 3. Aplicar as regras de exclusão ---
+    # Todas as regras em uma passada sobre os ativos (ver calculo/elegibilidade.py)
+    elegiveis, exclusoes = motor.compilar(exclusao).aplicar(df_consolidado)
+    colaboradores_elegiveis = df_consolidado[elegiveis].copy()
+    
+    # CORREÇÃO: Renomear a coluna de dias úteis para um nome simples para a próxima etapa
+    # A coluna 'dias_uteis' original do CSV será descartada, e usaremos a do BD.
+    colaboradores_elegiveis.rename(columns={'dias_uteis_dias_uteis_bd': 'dias_uteis'}, inplace=True)
+
+    # Materializa o resultado na tabela de saída, como no modo SQL
+    with conn:
+        conn.execute(f"DELETE FROM {OUTPUT_TABLE}")
+    colaboradores_elegiveis.to_sql(OUTPUT_TABLE, conn, if_exists='append', index=False)
+
+    return colaboradores_elegiveis, exclusoes
+
+def consolidar_e_filtrar_dados(modo='sql', exportar_csv=False, tabelas=None):
     """
     Conecta ao banco de dados, consolida as tabelas em um DataFrame
     e aplica as regras de exclusão para o cálculo do VR.
+
+    `modo` 'sql' (padrão) aplica as regras no SQLite; 'pandas' carrega as
+    tabelas inteiras e aplica as regras em memória. O resultado fica na
+    tabela `colaboradores_elegiveis`, com os tipos preservados, e também é
+    retornado para uso no mesmo processo. Com `exportar_csv` uma cópia é
+    gravada em OUTPUT_PATH. `tabelas` é o cache usado pelo modo 'pandas'.
     """
     if not os.path.exists(DB_PATH):
         print(f"Erro: O arquivo de banco de dados não foi encontrado em {DB_PATH}")
@@ -19,74 +123,25 @@ def consolidar_e_filtrar_dados():
 
     # Conexão com o banco de dados
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH)
         print("Conexão com o banco de dados estabelecida com sucesso.")
 
-        # --- 1. Carregar as tabelas para a memória ---
-        ativos = pd.read_sql_query("SELECT * FROM ativos", conn)
-        print(f"Tabela 'ativos' carregada. Linhas: {len(ativos)}")
-
-        aprendiz = pd.read_sql_query("SELECT matricula FROM aprendiz", conn)
-        estagio = pd.read_sql_query("SELECT matricula FROM estagio", conn)
-        afastamentos = pd.read_sql_query("SELECT matricula FROM afastamentos", conn)
-        exterior = pd.read_sql_query("SELECT matricula FROM exterior", conn)
-        desligados = pd.read_sql_query("SELECT matricula FROM desligados", conn)
-        ferias = pd.read_sql_query("SELECT matricula FROM ferias", conn)
-        base_sindicato = pd.read_sql_query("SELECT * FROM base_sindicato_valor", conn)
-        base_dias_uteis = pd.read_sql_query("SELECT * FROM base_dias_uteis", conn)
-        
-        # --- CORREÇÃO: Limpar as colunas de união ---
-        ativos['matricula'] = ativos['matricula'].astype(str).str.strip()
-        ativos['sindicato'] = ativos['sindicato'].astype(str).str.strip()
-        aprendiz['matricula'] = aprendiz['matricula'].astype(str).str.strip()
-        estagio['matricula'] = estagio['matricula'].astype(str).str.strip()
-        afastamentos['matricula'] = afastamentos['matricula'].astype(str).str.strip()
-        exterior['matricula'] = exterior['matricula'].astype(str).str.strip()
-        desligados['matricula'] = desligados['matricula'].astype(str).str.strip()
-        ferias['matricula'] = ferias['matricula'].astype(str).str.strip()
-        base_sindicato['sindicato'] = base_sindicato['sindicato'].astype(str).str.strip()
-        base_dias_uteis['sindicato'] = base_dias_uteis['sindicato'].astype(str).str.strip()
-
-
-        # --- 2. Juntar as tabelas para consolidar os dados ---
-        # Juntando as bases de sindicato e dias úteis com a base de ativos
-        df_consolidado = pd.merge(ativos, base_sindicato, on='sindicato', how='left')
-        
-        # CORREÇÃO: Adicionar um sufixo para evitar conflito de nomes e garantir a união
-        df_consolidado = pd.merge(df_consolidado, base_dias_uteis, on='sindicato', how='left', suffixes=('', '_dias_uteis_bd'))
-        
-        # Juntando as bases de exclusão (necessário para a lógica de filtro)
-        df_consolidado = pd.merge(df_consolidado, desligados, on='matricula', how='left', suffixes=('', '_desligados'))
-        df_consolidado = pd.merge(df_consolidado, ferias, on='matricula', how='left', suffixes=('', '_ferias'))
-        
-        # Adiciona colunas para identificar os grupos de exclusão
-        df_consolidado['is_aprendiz'] = df_consolidado['matricula'].isin(aprendiz['matricula'])
-        df_consolidado['is_estagiario'] = df_consolidado['matricula'].isin(estagio['matricula'])
-        df_consolidado['is_afastado'] = df_consolidado['matricula'].isin(afastamentos['matricula'])
-        df_consolidado['is_exterior'] = df_consolidado['matricula'].isin(exterior['matricula'])
-        
-        df_consolidado['is_diretor'] = df_consolidado['titulo_do_cargo'].str.contains('diretor', case=False, na=False)
-
-        # --- 3. Aplicar as regras de exclusão ---
-        colaboradores_elegiveis = df_consolidado[
-            (df_consolidado['is_aprendiz'] == False) &
-            (df_consolidado['is_estagiario'] == False) &
-            (df_consolidado['is_afastado'] == False) &
-            (df_consolidado['is_exterior'] == False) &
-            (df_consolidado['is_diretor'] == False)
-        ].copy()
-        
-        colaboradores_elegiveis.drop(columns=['is_aprendiz', 'is_estagiario', 'is_afastado', 'is_exterior', 'is_diretor'], inplace=True)
-        
-        # CORREÇÃO: Renomear a coluna de dias úteis para um nome simples para a próxima etapa
-        # A coluna 'dias_uteis' original do CSV será descartada, e usaremos a do BD.
-        colaboradores_elegiveis.rename(columns={'dias_uteis_dias_uteis_bd': 'dias_uteis'}, inplace=True)
+        if modo == 'sql':
+            colaboradores_elegiveis, exclusoes = consolidar_sql(conn)
+        else:
+            colaboradores_elegiveis, exclusoes = consolidar_pandas(conn, tabelas)
 
+        for regra, quantidade in exclusoes.items():
+            print(f"Regra de exclusão '{regra}': {quantidade} colaborador(es) excluído(s).")
         print(f"Base de dados consolidada e filtrada para {len(colaboradores_elegiveis)} colaboradores elegíveis.")
+        instrumentacao.registrar(linhas_saida=len(colaboradores_elegiveis), modo=modo, exclusoes=exclusoes)
 
-        # --- 4. Salvar o resultado para a próxima etapa ---
-        colaboradores_elegiveis.to_csv(OUTPUT_PATH, index=False)
-        print(f"Base de dados salva com sucesso em {OUTPUT_PATH}")
+        # --- 4. Resultado disponível para a próxima etapa ---
+        print(f"Base de dados salva com sucesso na tabela '{OUTPUT_TABLE}'")
+        if exportar_csv:
+            colaboradores_elegiveis.to_csv(OUTPUT_PATH, index=False)
+            print(f"Cópia exportada em {OUTPUT_PATH}")
+        return colaboradores_elegiveis
 
     except sqlite3.Error as e:
         print(f"Erro no banco de dados: {e}")
@@ -96,4 +151,6 @@ def consolidar_e_filtrar_dados():
             print("Conexão com o banco de dados fechada.")
 
 if __name__ == "__main__":
-    consolidar_e_filtrar_dados()
+    # VR_METRICAS e VR_PERFIL ativam a coleta de métricas (ver instrumentacao.py)
+    with instrumentacao.do_ambiente(), instrumentacao.span('consolidar_e_filtrar_dados'):
+        consolidar_e_filtrar_dados()
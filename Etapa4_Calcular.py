@@ -1,127 +1,204 @@
+import os
 import pandas as pd
 import sqlite3
-import re
-import numpy as np
-from datetime import datetime
-import openpyxl
 
-def calcular_vr():
+import instrumentacao
+
+from calculo.afastamentos import dias_afastado_por_matricula
+from calculo.agregacao import agregar_desligados, agregar_ferias, mesclar_sem_expansao
+from calculo.calendario import CalendarioDiasUteis
+from calculo.desligamento import aplicar_regra_desligamento
+from calculo.exportacao import FORMATOS_COLUNA, EscritorResultado, salvar_xlsx
+from calculo.historico import comparar_resultados, do_historico, impressoes_entrada, para_historico
+from calculo.tipos import DicionarioCategorias, compactar, para_matricula
+from database.connection import connect
+from database.prefetch import prefetch, read_table
+from database.results import delete_results, read_results, save_results
+
+# Competência calculada quando nenhuma é informada. É também a competência
+# a que se referem as planilhas de dias úteis por sindicato e de férias, que
+# não trazem datas; nas demais competências, os dias úteis vêm do calendário
+# e as férias não são descontadas (ver calcular_lote)
+COMPETENCIA_PADRAO = '05/2025'
+
+# Observação das linhas com férias na base, fora de COMPETENCIA_PADRAO
+OBS_FERIAS_SEM_PERIODO = f'Férias não descontadas: a base de férias é da competência {COMPETENCIA_PADRAO}'
+
+# Colunas da tabela de resultados, na ordem do arquivo final
+COLUNAS_RESULTADO = [
+    'Matricula', 'Admissão', 'Sindicato do Colaborador', 'Competência', 'Dias', 'VALOR DIÁRIO VR', 'TOTAL',
+    'Custo empresa', 'Desconto profissional', 'OBS GERAL'
+]
+
+# Relatório de diferenças do cálculo incremental
+DIFERENCAS_PATH = './calculo_vr_diferencas.xlsx'
+
+# Colunas somadas no resumo por competência do modo em lotes
+COLUNAS_RESUMO = ['Dias', 'TOTAL', 'Custo empresa', 'Desconto profissional']
+
+# Tabelas de referência lidas por calcular_vr, em paralelo (ver preparar_tabela)
+TABELAS_REFERENCIA = ['admissoes', 'afastamentos', 'ferias', 'desligados', 'base_dias_uteis', 'base_sindicato_valor']
+
+# Erros de leitura do banco: o pandas (read_sql_query) relança os erros do
+# sqlite3 como pandas.errors.DatabaseError
+ERROS_BANCO = (sqlite3.Error, pd.errors.DatabaseError)
+
+
+def mensagem_erro_banco(contexto, erro, orientacao=None):
     """
-    Calcula o VR com base nas regras de negócio fornecidas e exporta para XLSX.
+    Monta a mensagem de um erro de leitura do banco. Uma tabela inexistente
+    indica que uma etapa anterior ainda não foi executada: a mensagem
+    inclui `orientacao` (padrão: executar a carga e a consolidação).
     """
-    db_path = './database/bd.sqlite'
-    csv_path = './dados_consolidados_e_filtrados.csv'
-    output_path = './calculo_vr_final.xlsx'
+    mensagem = f"{contexto}: {erro}"
+    if 'no such table' in str(erro):
+        mensagem += '\n' + (orientacao or (
+            "Execute antes a carga das planilhas (python vr.py carregar) e a consolidação "
+            "(python vr.py consolidar, Etapa 3)."
+        ))
+    return mensagem
 
-    try:
-        # Conecta ao banco de dados e carrega os DataFrames
-        conn = sqlite3.connect(db_path)
-        df_principal = pd.read_csv(csv_path)
-        
-        # Carrega a tabela de admissões completa
-        df_admissoes = pd.read_sql_query("SELECT matricula, admissao FROM admissoes", conn)
-        
-        # Carrega as outras tabelas
-        df_afastamentos = pd.read_sql_query("SELECT * FROM afastamentos", conn)
-        df_ferias = pd.read_sql_query("SELECT * FROM ferias", conn)
-        df_desligados = pd.read_sql_query("SELECT * FROM desligados", conn)
-        df_base_dias_uteis = pd.read_sql_query("SELECT * FROM base_dias_uteis", conn)
-        df_base_sindicato_valor = pd.read_sql_query("SELECT * FROM base_sindicato_valor", conn)
-        print("Dados carregados com sucesso.\n")
-    except (sqlite3.Error, FileNotFoundError) as e:
-        print(f"Erro ao carregar arquivos: {e}")
-        return
-    finally:
-        if conn:
-            conn.close()
 
-    # 1. Limpeza e preparação dos dados
-    # Converte as colunas de datas para o tipo datetime
-    df_desligados['data_demissao'] = pd.to_datetime(df_desligados['data_demissao'], errors='coerce')
-    df_admissoes['admissao'] = pd.to_datetime(df_admissoes['admissao'], errors='coerce')
-
-    # Garante que as colunas de união (matricula, sindicato) são strings e sem espaços
-    df_principal['matricula'] = df_principal['matricula'].astype(str).str.strip()
-    df_admissoes['matricula'] = df_admissoes['matricula'].astype(str).str.strip()
-    df_afastamentos['matricula'] = df_afastamentos['matricula'].astype(str).str.strip()
-    df_ferias['matricula'] = df_ferias['matricula'].astype(str).str.strip()
-    df_desligados['matricula'] = df_desligados['matricula'].astype(str).str.strip()
-    
-    df_principal['sindicato'] = df_principal['sindicato'].astype(str).str.strip()
-    df_base_dias_uteis['sindicato'] = df_base_dias_uteis['sindicato'].astype(str).str.strip()
-    df_base_sindicato_valor['sindicato'] = df_base_sindicato_valor['sindicato'].astype(str).str.strip()
-    
+def preparar_tabela(tabela, df, categorias, tipar=True):
+    """
+    Prepara uma tabela logo após a leitura, sem depender das demais.
+
+    Com `tipar`, as datas são convertidas e as chaves compactadas com o
+    dicionário `categorias` (o cache já entrega as tabelas assim). Férias e
+    desligamentos são reduzidos a uma linha por matrícula, para que as
+    junções não multipliquem as linhas do colaborador, e as admissões viram
+    o mapeamento matricula -> admissao usado em cada lote. A base
+    consolidada é devolvida como veio: ela é compactada lote a lote.
+    """
+    if tabela == 'colaboradores_elegiveis':
+        return df
+    if tabela == 'admissoes':
+        df = df[['matricula', 'admissao']]
+    if tipar:
+        for coluna in ('admissao', 'data_demissao'):
+            if coluna in df.columns:
+                df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+        compactar(df, categorias)
+
+    if tabela == 'admissoes':
+        return df.set_index('matricula')['admissao'].to_dict()
+    if tabela == 'ferias':
+        return agregar_ferias(df)
+    if tabela == 'desligados':
+        return agregar_desligados(df)
+    return df
+
+
+def ler_lotes(conn, tamanho_lote):
+    """
+    Lê a tabela colaboradores_elegiveis em lotes de até `tamanho_lote`
+    linhas, na ordem de gravação. Cada lote continua do último rowid lido
+    (paginação por chave, sem OFFSET), então cada consulta percorre só as
+    linhas do próprio lote.
+    """
+    ultimo = 0
+    while True:
+        lote = pd.read_sql_query(
+            "SELECT rowid AS _rowid, * FROM colaboradores_elegiveis WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            conn, params=(ultimo, tamanho_lote)
+        )
+        if lote.empty:
+            return
+        ultimo = int(lote['_rowid'].iloc[-1])
+        yield lote.drop(columns='_rowid')
+
+
+def calcular_lote(df_principal, df_competencias, calendario, admissoes_map, df_afastamentos, df_ferias, df_desligados,
+                  df_base_dias_uteis, df_base_sindicato_valor):
+    """
+    Calcula o VR de um conjunto de colaboradores (a base inteira ou um lote)
+    contra as tabelas de referência já preparadas por calcular_vr: férias e
+    desligamentos com uma linha por matrícula e os afastamentos ainda com as
+    observações. Retorna a tabela de resultados com as COLUNAS_RESULTADO.
+
+    Os afastamentos são contados só dentro do mês de cada competência. A
+    base de dias úteis e a de férias valem para COMPETENCIA_PADRAO; nas
+    outras competências, os dias úteis do mês vêm do calendário e as férias,
+    sem datas, não são descontadas: essas linhas levam OBS_FERIAS_SEM_PERIODO
+    em 'OBS GERAL'.
+    """
     # 2. Processar a tabela de afastamentos
-    def calcular_dias_afastado(observacao):
-        if pd.isna(observacao): return 0
-        padrao = r'(\d{2}\/\d{2}(?:\/\d{4})?)'
-        match = re.search(padrao, str(observacao))
-        if match:
-            data_str = match.group(1)
-            try:
-                if len(data_str.split('/')) == 2:
-                    data_str += '/2024'
-                data_retorno = datetime.strptime(data_str, '%d/%m/%Y')
-                data_inicio_licenca = data_retorno.replace(day=1)
-                return np.busday_count(data_inicio_licenca.date(), data_retorno.date())
-            except ValueError: return 0
-        return 0
+    # Só os afastamentos dos colaboradores do lote
+    df_afastamentos = df_afastamentos[df_afastamentos['matricula'].isin(df_principal['matricula'])]
 
-    df_afastamentos['dias_afastado'] = df_afastamentos['observacao'].apply(calcular_dias_afastado)
+    sindicato_map = df_principal.drop_duplicates('matricula').set_index('matricula')['sindicato']
+    sindicatos_afastados = df_afastamentos['matricula'].map(sindicato_map).to_numpy()
+
+    # Datas sem ano assumem o ano da competência, então os dias afastados são
+    # calculados para cada competência, já somados por matrícula e com os
+    # intervalos sobrepostos unidos e limitados ao mês da competência (ver
+    # calculo/afastamentos.py)
+    with instrumentacao.span('afastamentos', 'calculo') as trecho:
+        afastamentos_por_competencia = []
+        for competencia, inicio in zip(df_competencias['Competência'], df_competencias['inicio_competencia']):
+            df_dias = dias_afastado_por_matricula(
+                df_afastamentos['matricula'], df_afastamentos['observacao'], inicio.year, calendario, sindicatos_afastados,
+                periodo=(inicio, inicio + pd.DateOffset(months=1))
+            )
+            df_dias['Competência'] = competencia
+            afastamentos_por_competencia.append(df_dias)
+        df_afastamentos = pd.concat(afastamentos_por_competencia, ignore_index=True)
+        trecho.registrar(linhas_entrada=len(sindicatos_afastados), linhas_saida=len(df_afastamentos))
 
     # 3. Adicionar a coluna de admissão no DataFrame principal
-    # Cria um dicionário de mapeamento: matricula -> admissao
-    # Garante que a matricula seja a chave no dicionário
-    admissoes_map = df_admissoes.set_index('matricula')['admissao'].to_dict()
-    
-    # Adiciona a coluna 'admissao' ao DataFrame principal usando o mapeamento
-    df_principal['admissao'] = df_principal['matricula'].map(admissoes_map)
-    
-    # Mesclar os demais DataFrames
     df_final = df_principal.copy()
+    df_final['admissao'] = df_final['matricula'].map(admissoes_map)
     
-    df_final = pd.merge(df_final, df_base_dias_uteis, on='sindicato', how='left', suffixes=('_csv', '_bd_dias_uteis'))
-    df_final = pd.merge(df_final, df_base_sindicato_valor, on='sindicato', how='left', suffixes=('', '_bd_valor'))
-    
-    df_final = pd.merge(df_final, df_ferias[['matricula', 'dias_de_ferias']], on='matricula', how='left')
-    df_final = pd.merge(df_final, df_afastamentos[['matricula', 'dias_afastado']], on='matricula', how='left')
-    df_final = pd.merge(df_final, df_desligados[['matricula', 'data_demissao', 'comunicado_de_desligamento']], on='matricula', how='left')
+    # Mesclar os demais DataFrames
+    with instrumentacao.span('juncoes', 'calculo') as trecho:
+        df_final = mesclar_sem_expansao(df_final, df_base_dias_uteis, 'sindicato', 'base_dias_uteis', suffixes=('_principal', '_bd_dias_uteis'))
+        df_final = mesclar_sem_expansao(df_final, df_base_sindicato_valor, 'sindicato', 'base_sindicato_valor', suffixes=('', '_bd_valor'))
     
+        df_final = mesclar_sem_expansao(df_final, df_ferias, 'matricula', 'ferias')
+        df_final = mesclar_sem_expansao(df_final, df_desligados, 'matricula', 'desligados')
+
+        # Uma linha por (competência, colaborador): todas as competências são
+        # calculadas de uma vez, sobre as mesmas tabelas de referência
+        df_final = pd.merge(df_competencias, df_final, how='cross')
+        df_final = mesclar_sem_expansao(df_final, df_afastamentos, ['matricula', 'Competência'], 'afastamentos')
+        trecho.registrar(linhas_entrada=len(df_principal), linhas_saida=len(df_final))
+
     # 4. Tratar valores ausentes e garantir o tipo numérico
     df_final['dias_uteis_bd_dias_uteis'] = df_final['dias_uteis_bd_dias_uteis'].fillna(0)
     df_final['dias_de_ferias'] = df_final['dias_de_ferias'].fillna(0)
     df_final['dias_afastado'] = df_final['dias_afastado'].fillna(0)
+    df_final['OBS GERAL'] = ''
+
+    # Fora de COMPETENCIA_PADRAO: dias úteis do mês pelo calendário do
+    # sindicato e férias sem período marcadas em vez de descontadas
+    outra_competencia = df_final['Competência'].ne(COMPETENCIA_PADRAO).to_numpy()
+    if outra_competencia.any():
+        inicio = df_final.loc[outra_competencia, 'inicio_competencia']
+        df_final.loc[outra_competencia, 'dias_uteis_bd_dias_uteis'] = calendario.dias_uteis(
+            inicio.to_numpy(), (inicio + pd.DateOffset(months=1)).to_numpy(),
+            df_final.loc[outra_competencia, 'sindicato'].to_numpy()
+        )
+        ferias_sem_periodo = outra_competencia & df_final['dias_de_ferias'].gt(0).to_numpy()
+        df_final.loc[ferias_sem_periodo, 'OBS GERAL'] = OBS_FERIAS_SEM_PERIODO
+        df_final.loc[outra_competencia, 'dias_de_ferias'] = 0
     
-    df_final['valor_bd_valor'] = pd.to_numeric(
-        df_final['valor_bd_valor'].astype(str).str.replace('R$', '', regex=False).str.replace(',', '.', regex=False),
-        errors='coerce'
-    ).fillna(0)
+    # O valor do sindicato é gravado em centavos inteiros na carga (ver database/money.py)
+    df_final['valor_bd_valor'] = df_final['valor_centavos_bd_valor'].astype(float).fillna(0) / 100
 
     # 5. Aplicar as regras de cálculo
     df_final['dias_uteis_elegiveis'] = df_final['dias_uteis_bd_dias_uteis'] - df_final['dias_de_ferias'] - df_final['dias_afastado']
 
-    def aplicar_regra_desligamento(row):
-        if pd.notna(row['comunicado_de_desligamento']):
-            if row['comunicado_de_desligamento'] == 'OK':
-                if pd.notna(row['data_demissao']) and row['data_demissao'].day <= 15:
-                    return 0
-                elif pd.notna(row['data_demissao']):
-                    dias_uteis_restantes = np.busday_count(row['data_demissao'].date(), (pd.to_datetime(f"{row['data_demissao'].year}-{row['data_demissao'].month}-01") + pd.offsets.MonthEnd(0)).date())
-                    dias_totais_uteis = np.busday_count(pd.to_datetime(f"{row['data_demissao'].year}-{row['data_demissao'].month}-01").date(), (pd.to_datetime(f"{row['data_demissao'].year}-{row['data_demissao'].month}-01") + pd.offsets.MonthEnd(0)).date())
-                    proporcao = dias_uteis_restantes / dias_totais_uteis if dias_totais_uteis > 0 else 0
-                    return row['dias_uteis_elegiveis'] * proporcao
-        return row['dias_uteis_elegiveis']
-
-    df_final['dias_uteis_elegiveis'] = df_final.apply(aplicar_regra_desligamento, axis=1)
+    # Regra de desligamento calculada sobre a coluna inteira (ver calculo/desligamento.py)
+    df_final['dias_uteis_elegiveis'] = aplicar_regra_desligamento(
+        df_final, calendario, inicio_competencia=df_final['inicio_competencia']
+    )
     
     df_final['VALOR DIÁRIO VR'] = df_final['valor_bd_valor']
     df_final['TOTAL'] = df_final['dias_uteis_elegiveis'] * df_final['VALOR DIÁRIO VR']
     df_final['Custo empresa'] = df_final['TOTAL'] * 0.80
     df_final['Desconto profissional'] = df_final['TOTAL'] * 0.20
-    df_final['Competência'] = '05/2025'
-    df_final['OBS GERAL'] = ''
     
-    # 6. Gerar a tabela de resultados e exportar para XLSX
+    # 6. Gerar a tabela de resultados
     df_resultado = df_final.rename(columns={
         'matricula': 'Matricula',
         'sindicato': 'Sindicato do Colaborador',
@@ -129,19 +206,313 @@ def calcular_vr():
         'admissao': 'Admissão'
     })
     
-    df_resultado = df_resultado[['Matricula', 'Admissão', 'Sindicato do Colaborador', 'Competência', 'Dias', 'VALOR DIÁRIO VR', 'TOTAL', 'Custo empresa', 'Desconto profissional', 'OBS GERAL']]
-    
-    df_resultado['Dias'] = df_resultado['Dias'].apply(lambda x: '{:.2f}'.format(x).replace('.', ','))
-    
+    # Dias continua numérico; o formato com duas casas é aplicado na planilha (ver calculo/exportacao.py)
+    return df_resultado[COLUNAS_RESULTADO]
+
+
+def calcular_lote_incremental(conn, df_principal, df_competencias, calendario, admissoes_map, df_afastamentos, df_ferias,
+                              df_desligados, df_base_dias_uteis, df_base_sindicato_valor, calculado_em):
+    """
+    Como calcular_lote, mas só recalcula os colaboradores cujas entradas
+    mudaram desde a última execução gravada em vr_calculado (ver
+    calculo/historico.py); os demais resultados são lidos da tabela. Os
+    resultados recalculados são gravados, sem commit.
+
+    Retorna (resultado, diferenças em relação à execução anterior, número
+    de colaboradores recalculados).
+    """
+    referencias = (admissoes_map, df_afastamentos, df_ferias, df_desligados, df_base_dias_uteis, df_base_sindicato_valor)
+    impressoes = impressoes_entrada(df_principal, df_competencias, *referencias)
+    anterior = do_historico(read_results(conn, df_competencias['Competência'], df_principal['matricula'].unique()))
+
+    # Um colaborador é recalculado (em todas as competências) se a impressão
+    # de alguma de suas linhas mudou ou não existe
+    chaves = ['Competência', 'Matricula']
+    comparacao = mesclar_sem_expansao(impressoes, anterior[chaves + ['impressao']], chaves, 'vr_calculado', suffixes=('', '_anterior'))
+    mudou = comparacao['impressao'].ne(comparacao['impressao_anterior']).fillna(True).to_numpy(dtype=bool)
+    mudaram = impressoes.loc[mudou, 'Matricula'].unique()
+    recalcular = df_principal['matricula'].isin(mudaram)
+
+    if recalcular.any():
+        novos = calcular_lote(df_principal[recalcular], df_competencias, calendario, *referencias)
+        save_results(conn, para_historico(novos, impressoes, calculado_em))
+    else:
+        novos = pd.DataFrame(columns=COLUNAS_RESULTADO)
+    reaproveitados = anterior[~anterior['Matricula'].isin(mudaram)][COLUNAS_RESULTADO]
+
+    # Mesma ordem de linhas do cálculo completo
+    df_resultado = mesclar_sem_expansao(
+        impressoes[chaves], pd.concat([novos, reaproveitados], ignore_index=True), chaves, 'resultados'
+    )[COLUNAS_RESULTADO]
+    diferencas = comparar_resultados(anterior[anterior['Matricula'].isin(mudaram)], novos)
+    return df_resultado, diferencas, int(recalcular.sum())
+
+
+def calcular_vr(df_principal=None, tabelas=None, competencias=None, empresas=None, particionar=False, saidas_extras=None,
+                tamanho_lote=None, incremental=False):
+    """
+    Calcula o VR com base nas regras de negócio fornecidas e exporta para XLSX.
+
+    `df_principal` é a base consolidada pela Etapa 3. Se não for informada,
+    é lida da tabela colaboradores_elegiveis. `tabelas` é um cache opcional
+    (pipeline.TabelaCache) com as tabelas já tipadas e com as chaves
+    normalizadas; sem ele, as tabelas são lidas do banco.
+
+    `competencias` é a lista de competências ('MM/AAAA') calculadas numa
+    única passada (padrão: COMPETENCIA_PADRAO; para as demais, ver
+    calcular_lote) e `empresas` restringe o
+    cálculo a esses códigos de empresa. O resultado é uma tabela longa com
+    uma linha por competência e colaborador; com `particionar`, cada
+    competência é salva em um arquivo próprio. `saidas_extras` pede cópias
+    em 'csv' e/ou 'parquet' ao lado de cada XLSX. Retorna a tabela de resultados.
+
+    Com `tamanho_lote`, os colaboradores são calculados em lotes desse
+    tamanho, lidos do banco aos poucos (ou fatiados de `df_principal`), e
+    cada lote é gravado nos arquivos assim que calculado: só as tabelas de
+    referência, já resumidas por matrícula, ficam inteiras na memória. Nesse
+    modo, o retorno é um resumo por competência (colaboradores e somas de
+    COLUNAS_RESUMO), e não a tabela completa.
+
+    Com `incremental`, os resultados ficam gravados na tabela vr_calculado
+    com a impressão das entradas de cada linha, e só os colaboradores cujas
+    entradas mudaram desde a execução anterior são recalculados (ver
+    calcular_lote_incremental). As diferenças em relação à execução
+    anterior, incluindo colaboradores que saíram da base, são salvas em
+    DIFERENCAS_PATH. Com `empresas`, as saídas não são detectadas.
+    """
+    db_path = './database/bd.sqlite'
+    output_path = './calculo_vr_final.xlsx'
+
+    conn = None
     try:
-        df_resultado.to_excel(output_path, index=False)
-        print(f"Cálculo de Vale Refeição concluído com sucesso.")
-        print(f"Os resultados foram salvos em: {output_path}")
+        # Conecta ao banco de dados e carrega os DataFrames
+        conn = connect(db_path, read_only=True)
+
+        def carregar(tabela, consulta=None):
+            def ler():
+                with instrumentacao.span(tabela, 'tabela') as trecho:
+                    if tabelas is not None and consulta is None:
+                        df = tabelas.get(tabela)
+                    else:
+                        df = read_table(tabela, db_path, consulta)
+                    trecho.registrar(linhas_saida=len(df))
+                return df
+            return ler
+
+        cargas = {tabela: carregar(tabela) for tabela in TABELAS_REFERENCIA}
+        if df_principal is None and not tamanho_lote:
+            cargas['colaboradores_elegiveis'] = carregar(
+                'colaboradores_elegiveis', "SELECT * FROM colaboradores_elegiveis ORDER BY rowid"
+            )
+
+        # As tabelas são lidas em paralelo e cada uma é preparada assim que
+        # chega, enquanto as outras ainda estão sendo lidas.
+        # Matrícula inteira e sindicato/estado/empresa/situação como categorias de
+        # um dicionário comum, para que as junções comparem códigos (ver calculo/tipos.py).
+        # Com o cache, as tabelas já chegam tipadas e compactadas.
+        categorias = tabelas.categorias if tabelas is not None else DicionarioCategorias()
+        preparadas = {}
+        for tabela, df in prefetch(cargas):
+            preparadas[tabela] = preparar_tabela(tabela, df, categorias, tipar=tabelas is None)
+        print("Dados carregados com sucesso.\n")
+    except ERROS_BANCO as e:
+        print(mensagem_erro_banco("Erro ao carregar arquivos", e))
+        if conn:
+            conn.close()
+        return
+
+    df_principal = preparadas.pop('colaboradores_elegiveis', df_principal)
+    admissoes_map = preparadas['admissoes']
+    df_afastamentos = preparadas['afastamentos']
+    df_ferias = preparadas['ferias']
+    df_desligados = preparadas['desligados']
+    df_base_dias_uteis = preparadas['base_dias_uteis']
+    df_base_sindicato_valor = preparadas['base_sindicato_valor']
+
+    # Competências calculadas, com o primeiro dia de cada mês
+    df_competencias = pd.DataFrame({'Competência': list(competencias or [COMPETENCIA_PADRAO])})
+    df_competencias['inicio_competencia'] = pd.to_datetime(
+        '01/' + df_competencias['Competência'], format='%d/%m/%Y'
+    )
+
+    # Calendário de dias úteis com os feriados do estado de cada sindicato
+    calendario = CalendarioDiasUteis.from_base_sindicato(df_base_sindicato_valor)
+
+    # Sem `tamanho_lote`, a base inteira é um único lote
+    if not tamanho_lote:
+        lotes = [df_principal]
+    elif df_principal is None:
+        lotes = ler_lotes(conn, tamanho_lote)
+    else:
+        lotes = (df_principal.iloc[inicio:inicio + tamanho_lote] for inicio in range(0, len(df_principal), tamanho_lote))
+
+    # O histórico é gravado por uma conexão de escrita própria
+    conn_historico = None
+    calculado_em = pd.Timestamp.now().isoformat(timespec='seconds')
+    diferencas = []
+    processadas = []
+    recalculados = 0
+
+    escritor = None
+    erro_saida = None
+    resumos = []
+    df_resultado = None
+    total_entrada = total_saida = 0
+    try:
+        escritor = EscritorResultado(output_path, COLUNAS_RESULTADO, saidas_extras, particionar)
     except Exception as e:
-        print(f"Erro ao salvar o arquivo de resultados: {e}")
+        erro_saida = e
+
+    try:
+        if incremental:
+            conn_historico = connect(db_path)
+
+        for numero, lote in enumerate(lotes, start=1):
+            with instrumentacao.span(f'lote {numero}', 'lote') as trecho:
+                lote = compactar(lote.copy(), categorias)
+                if empresas:
+                    lote = lote[lote['empresa'].astype(str).isin([str(e) for e in empresas])]
+
+                referencias = (
+                    admissoes_map, df_afastamentos, df_ferias, df_desligados, df_base_dias_uteis, df_base_sindicato_valor
+                )
+                if incremental:
+                    df_lote, df_diferencas, n_recalculados = calcular_lote_incremental(
+                        conn_historico, lote, df_competencias, calendario, *referencias, calculado_em
+                    )
+                    conn_historico.commit()
+                    diferencas.append(df_diferencas)
+                    processadas.append(lote['matricula'])
+                    recalculados += n_recalculados
+                    trecho.registrar(recalculados=n_recalculados)
+                else:
+                    df_lote = calcular_lote(lote, df_competencias, calendario, *referencias)
+
+                if erro_saida is None:
+                    try:
+                        with instrumentacao.span('exportacao', 'saida') as trecho_saida:
+                            escritor.escrever(df_lote)
+                            trecho_saida.registrar(linhas_entrada=len(df_lote))
+                    except Exception as e:
+                        erro_saida = e
+
+                total_entrada += len(lote)
+                total_saida += len(df_lote)
+                if tamanho_lote:
+                    resumo = df_lote.groupby('Competência', sort=False)[COLUNAS_RESUMO].sum()
+                    resumo.insert(0, 'Colaboradores', df_lote.groupby('Competência', sort=False).size())
+                    resumos.append(resumo)
+                    if df_resultado is None:
+                        df_resultado = df_lote.head()
+                else:
+                    df_resultado = df_lote
+                trecho.registrar(linhas_entrada=len(lote), linhas_saida=len(df_lote))
+
+        if incremental and not empresas:
+            # Colaboradores com resultado gravado que saíram da base
+            gravados = read_results(conn_historico, df_competencias['Competência'], columns=['matricula'])
+            presentes = pd.concat(processadas) if processadas else pd.Series([], dtype=object)
+            saidas = gravados.loc[~para_matricula(gravados['matricula']).isin(presentes), 'matricula'].unique()
+            if len(saidas):
+                removidos = do_historico(read_results(conn_historico, df_competencias['Competência'], saidas))
+                delete_results(conn_historico, removidos[['Competência', 'Matricula']].itertuples(index=False, name=None))
+                conn_historico.commit()
+                diferencas.append(comparar_resultados(removidos, removidos.iloc[:0]))
+    except ERROS_BANCO as e:
+        print(mensagem_erro_banco("Erro ao carregar arquivos", e))
+        return
+    finally:
+        if conn:
+            conn.close()
+        if conn_historico:
+            conn_historico.close()
+        if escritor is not None:
+            try:
+                arquivos = escritor.fechar()
+            except Exception as e:
+                erro_saida = erro_saida or e
+
+    if erro_saida is not None:
+        print(f"Erro ao salvar o arquivo de resultados: {erro_saida}")
+    else:
+        if particionar:
+            # Um arquivo por competência: calculo_vr_final_MM-AAAA.xlsx
+            for competencia, caminhos in arquivos.items():
+                print(f"Competência {competencia} salva em: {caminhos[0]}")
+        else:
+            print(f"Os resultados foram salvos em: {output_path}")
+        print(f"Cálculo de Vale Refeição concluído com sucesso.")
     
+    if incremental:
+        df_diferencas = pd.concat(diferencas, ignore_index=True) if diferencas else comparar_resultados(
+            pd.DataFrame(columns=COLUNAS_RESULTADO), pd.DataFrame(columns=COLUNAS_RESULTADO)
+        )
+        formatos = {**FORMATOS_COLUNA, **{f'{coluna} anterior': formato for coluna, formato in FORMATOS_COLUNA.items()}}
+        try:
+            salvar_xlsx(df_diferencas, DIFERENCAS_PATH, formatos)
+            print(f"Cálculo incremental: {recalculados} de {total_entrada} colaboradores recalculados; "
+                  f"{len(df_diferencas)} diferença(s) salvas em: {DIFERENCAS_PATH}")
+        except Exception as e:
+            print(f"Erro ao salvar o relatório de diferenças: {e}")
+        instrumentacao.registrar(recalculados=recalculados, diferencas=len(df_diferencas))
+
     print("\nAs primeiras linhas da tabela de resultados são:")
-    print(df_resultado.head())
+    print(df_resultado.head() if df_resultado is not None else pd.DataFrame(columns=COLUNAS_RESULTADO))
+
+    instrumentacao.registrar(linhas_entrada=total_entrada, linhas_saida=total_saida)
+    if tamanho_lote:
+        if not resumos:
+            return pd.DataFrame(columns=['Colaboradores'] + COLUNAS_RESUMO)
+        return pd.concat(resumos).groupby(level=0, sort=False).sum()
+    return df_resultado
+
+def exportar_resultados(competencias=None, particionar=False, saidas_extras=None):
+    """
+    Exporta os resultados gravados na tabela vr_calculado (cálculo com
+    `incremental`) sem recalcular nada, com os mesmos arquivos e formatos de
+    calcular_vr. As linhas saem ordenadas por competência e matrícula.
+    Retorna a tabela exportada.
+    """
+    db_path = './database/bd.sqlite'
+    output_path = './calculo_vr_final.xlsx'
+    competencias = list(competencias or [COMPETENCIA_PADRAO])
+
+    conn = None
+    try:
+        conn = connect(db_path, read_only=True)
+        df_resultado = do_historico(read_results(conn, competencias))
+    except ERROS_BANCO as e:
+        print(mensagem_erro_banco(
+            "Erro ao ler os resultados gravados", e,
+            "Os resultados são gravados pelo cálculo com --incremental (python vr.py calcular --incremental)."
+        ))
+        return
+    finally:
+        if conn:
+            conn.close()
+
+    if df_resultado.empty:
+        print(f"Nenhum resultado gravado para as competências {competencias}. Execute o cálculo com `incremental`.")
+        return df_resultado
+
+    df_resultado = df_resultado.sort_values(['Competência', 'Matricula'], kind='stable')[COLUNAS_RESULTADO]
+    try:
+        escritor = EscritorResultado(output_path, COLUNAS_RESULTADO, saidas_extras, particionar)
+        escritor.escrever(df_resultado)
+        arquivos = escritor.fechar()
+    except Exception as e:
+        print(f"Erro ao salvar o arquivo de resultados: {e}")
+        return df_resultado
+
+    for caminhos in arquivos.values():
+        print(f"{len(df_resultado)} linha(s) exportadas para: {', '.join(caminhos)}")
+    return df_resultado
 
 if __name__ == "__main__":
-    calcular_vr()
+    # VR_METRICAS e VR_PERFIL ativam a coleta de métricas (ver instrumentacao.py)
+    # VR_TAMANHO_LOTE ativa o cálculo em lotes desse número de colaboradores
+    # VR_INCREMENTAL=1 recalcula só os colaboradores cujas entradas mudaram
+    tamanho_lote = int(os.environ.get('VR_TAMANHO_LOTE') or 0) or None
+    incremental = os.environ.get('VR_INCREMENTAL', '') not in ('', '0')
+    with instrumentacao.do_ambiente(), instrumentacao.span('calcular_vr'):
+        calcular_vr(tamanho_lote=tamanho_lote, incremental=incremental)
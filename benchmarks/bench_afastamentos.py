@@ -0,0 +1,107 @@
+# File: benchmarks/bench_afastamentos.py
+"""
+Compara a extração da data de retorno linha a linha (implementação original
+da Etapa 4, via Series.apply) com calculo/afastamentos.py.
+
+Uso: python -m benchmarks.bench_afastamentos [quantidade_de_linhas]
+"""
+import re
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from calculo.afastamentos import calcular_dias_afastado, intervalos_afastamento
+
+ANO_PADRAO = 2024
+
+
+def calcular_dias_afastado_linha(observacao):
+    """Implementação original, com o ano padrão fixo."""
+    if pd.isna(observacao): return 0
+    padrao = r'(\d{2}\/\d{2}(?:\/\d{4})?)'
+    match = re.search(padrao, str(observacao))
+    if match:
+        data_str = match.group(1)
+        try:
+            if len(data_str.split('/')) == 2:
+                data_str += f'/{ANO_PADRAO}'
+            data_retorno = datetime.strptime(data_str, '%d/%m/%Y')
+            data_inicio_licenca = data_retorno.replace(day=1)
+            return np.busday_count(data_inicio_licenca.date(), data_retorno.date())
+        except ValueError: return 0
+    return 0
+
+
+def gerar_observacoes(n, seed=42):
+    """Gera observações sintéticas no estilo da planilha de afastamentos."""
+    rng = np.random.default_rng(seed)
+    dias = rng.integers(1, 32, n)
+    meses = rng.integers(1, 13, n)
+    anos = rng.integers(2023, 2026, n)
+    modelos = rng.integers(0, 5, n)
+    observacoes = []
+    for dia, mes, ano, modelo in zip(dias, meses, anos, modelos):
+        if modelo == 0:
+            observacoes.append(None)
+        elif modelo == 1:
+            observacoes.append(f'retorno da licença em {dia:02d}/{mes:02d}')
+        elif modelo == 2:
+            observacoes.append(f'retorno de férias + licença em {dia:02d}/{mes:02d}/{ano}')
+        elif modelo == 3:
+            observacoes.append('sem data prevista')
+        else:
+            # Inclui datas inválidas, como 31/02
+            observacoes.append(f'{dia:02d}/{mes:02d}')
+    return pd.Series(observacoes, dtype=object)
+
+
+def main(n=100_000):
+    observacoes = gerar_observacoes(n)
+
+    inicio = time.perf_counter()
+    esperado = observacoes.apply(calcular_dias_afastado_linha).to_numpy()
+    tempo_linha = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = calcular_dias_afastado(observacoes, ANO_PADRAO)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    np.testing.assert_array_equal(obtido, esperado)
+    print(f"Linhas: {n}")
+    print(f"Linha a linha: {tempo_linha:.3f} s")
+    print(f"Vetorizado:    {tempo_vetorizado:.3f} s ({tempo_linha / tempo_vetorizado:.0f}x)")
+    print("Resultados idênticos linha a linha.")
+
+    verificar_intervalos()
+
+
+def verificar_intervalos():
+    """
+    Confere as datas extraídas de observações com intervalos: as duas pontas
+    entram no afastamento, então o fim é o dia seguinte ao último dia.
+    """
+    intervalos = intervalos_afastamento(pd.Series([
+        'afastado de 05/05 a 16/05',
+        'licença 05/05/2025 - 16/05/2025',
+        'afastado de 05/05 a 09/05 e de 19/05 a 20/05',
+        'retorno da licença em 12/05',
+    ]), 2025)
+    esperado = pd.DataFrame({
+        'linha': [0, 1, 2, 2, 3],
+        'inicio': pd.to_datetime(['2025-05-05', '2025-05-05', '2025-05-05', '2025-05-19', '2025-05-01']),
+        'fim': pd.to_datetime(['2025-05-17', '2025-05-17', '2025-05-10', '2025-05-21', '2025-05-12']),
+    })
+    obtido = intervalos.sort_values(['linha', 'inicio'], kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+    # 05/05 a 09/05 (segunda a sexta) e 19/05 a 20/05 (segunda e terça)
+    exemplo = pd.Series(['afastado de 05/05 a 09/05 e de 19/05 a 20/05'])
+    dias = calcular_dias_afastado(exemplo, 2025)[0]
+    assert dias == 7, f"esperados 7 dias úteis, obtidos {dias}"
+    print(f"Intervalos conferidos; exemplo com dois intervalos: {dias} dias úteis")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,66 @@
+# File: benchmarks/bench_desligamento.py
+"""
+Compara a regra de desligamento linha a linha (implementação original da
+Etapa 4) com a versão vetorizada de calculo/desligamento.py.
+
+Uso: python -m benchmarks.bench_desligamento [quantidade_de_linhas]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from calculo.desligamento import aplicar_regra_desligamento
+
+
+def aplicar_regra_desligamento_linha(row):
+    """Implementação original, aplicada com df.apply(..., axis=1)."""
+    if pd.notna(row['comunicado_de_desligamento']):
+        if row['comunicado_de_desligamento'] == 'OK':
+            if pd.notna(row['data_demissao']) and row['data_demissao'].day <= 15:
+                return 0
+            elif pd.notna(row['data_demissao']):
+                dias_uteis_restantes = np.busday_count(row['data_demissao'].date(), (pd.to_datetime(f"{row['data_demissao'].year}-{row['data_demissao'].month}-01") + pd.offsets.MonthEnd(0)).date())
+                dias_totais_uteis = np.busday_count(pd.to_datetime(f"{row['data_demissao'].year}-{row['data_demissao'].month}-01").date(), (pd.to_datetime(f"{row['data_demissao'].year}-{row['data_demissao'].month}-01") + pd.offsets.MonthEnd(0)).date())
+                proporcao = dias_uteis_restantes / dias_totais_uteis if dias_totais_uteis > 0 else 0
+                return row['dias_uteis_elegiveis'] * proporcao
+    return row['dias_uteis_elegiveis']
+
+
+def gerar_dados(n, seed=42):
+    """Gera um DataFrame sintético com a mesma forma do df_final da Etapa 4."""
+    rng = np.random.default_rng(seed)
+    inicio = np.datetime64('2024-01-01')
+    datas = pd.Series(inicio + rng.integers(0, 730, n).astype('timedelta64[D]'))
+    # Cerca de 70% dos colaboradores não têm desligamento
+    datas[rng.random(n) < 0.7] = pd.NaT
+    comunicado = pd.Series(rng.choice(np.array(['OK', None], dtype=object), n, p=[0.9, 0.1]))
+    comunicado[datas.isna() & (rng.random(n) < 0.9)] = None
+    return pd.DataFrame({
+        'comunicado_de_desligamento': comunicado,
+        'data_demissao': pd.to_datetime(datas),
+        'dias_uteis_elegiveis': rng.integers(0, 23, n).astype(float),
+    })
+
+
+def main(n=100_000):
+    df = gerar_dados(n)
+
+    inicio = time.perf_counter()
+    esperado = df.apply(aplicar_regra_desligamento_linha, axis=1).astype(float)
+    tempo_linha = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = aplicar_regra_desligamento(df)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    np.testing.assert_allclose(obtido.to_numpy(), esperado.to_numpy(), rtol=0, atol=1e-12)
+    print(f"Linhas: {n}")
+    print(f"Linha a linha: {tempo_linha:.3f} s")
+    print(f"Vetorizado:    {tempo_vetorizado:.3f} s ({tempo_linha / tempo_vetorizado:.0f}x)")
+    print("Resultados idênticos linha a linha.")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,62 @@
+# File: benchmarks/bench_inicio.py
+"""
+Mede o tempo de inicialização de cada comando de vr.py: um interpretador
+novo que importa o vr e os módulos do comando (vr.importar), sem executar o
+trabalho. Cada comando é medido algumas vezes e vale a mediana, comparada
+com o orçamento de vr.ORCAMENTO_INICIO_MS.
+
+Uso: python -m benchmarks.bench_inicio [comando ...] [--repeticoes N]
+Sai com código 1 se algum comando passar do orçamento.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import vr
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir_inicio(comando, repeticoes=5):
+    """
+    Mediana, em milissegundos, do tempo de um processo que só importa os
+    módulos de `comando`.
+    """
+    codigo = f"import vr; vr.importar({comando!r})"
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de inicialização dos comandos de vr.py.")
+    parser.add_argument('comandos', nargs='*', help="Comandos medidos (padrão: todos)")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+    desconhecidos = [comando for comando in args.comandos if comando not in vr.COMANDOS]
+    if desconhecidos:
+        parser.error(f"comando(s) desconhecido(s): {', '.join(desconhecidos)}")
+
+    acima = []
+    for comando in args.comandos or vr.COMANDOS:
+        ms = medir_inicio(comando, args.repeticoes)
+        orcamento = vr.ORCAMENTO_INICIO_MS[comando]
+        situacao = 'ok' if ms <= orcamento else 'ACIMA'
+        if ms > orcamento:
+            acima.append(comando)
+        print(f"{comando:<12} {ms:7.0f} ms   orçamento {orcamento:5d} ms   {situacao}")
+
+    if acima:
+        print(f"\nComandos acima do orçamento: {', '.join(acima)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
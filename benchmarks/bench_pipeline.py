@@ -0,0 +1,161 @@
+# File: benchmarks/bench_pipeline.py
+"""
+Mede a carga (create_tables + populate_tables), a correção das bases, a
+consolidação (consolidar_e_filtrar_dados) e o cálculo (calcular_vr) sobre
+bases sintéticas de vários tamanhos (ver benchmarks/gerador_dados.py).
+
+Para cada tamanho, as etapas rodam em um diretório de trabalho próprio, com
+o banco e os arquivos de saída isolados do repositório. São registrados o
+tempo de cada etapa, o pico de memória alocada pelo Python na etapa
+(tracemalloc) e o pico de memória do processo (RSS). O resultado é gravado
+em JSON para comparar execuções entre commits.
+
+Uso: python -m benchmarks.bench_pipeline [tamanho ...] [--saida arquivo.json]
+     [--dados diretório_das_bases] [--sem-tracemalloc]
+Padrão: 1000 10000 100000 (1000000 também é aceito, mas leva alguns minutos).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+import database.create
+import database.populate
+from benchmarks.gerador_dados import TAMANHOS, gerar_base
+from Etapa2_Corrige import corrigir_base_sindicato
+from Etapa3_consolidar_filtrar import consolidar_e_filtrar_dados
+from Etapa4_Calcular import calcular_vr
+from instrumentacao import pico_rss_mb
+
+DIRETORIO_BASES = os.path.join('benchmarks', 'bases_sinteticas')
+DIRETORIO_RESULTADOS = os.path.join('benchmarks', 'resultados')
+
+
+def _commit_atual():
+    try:
+        resultado = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        )
+        return resultado.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir(nome, funcao, usar_tracemalloc=True):
+    """
+    Executa `funcao` com a saída padrão suprimida e devolve (resultado, medição).
+    """
+    if usar_tracemalloc:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcao()
+    finally:
+        segundos = time.perf_counter() - inicio
+        segundos_cpu = time.process_time() - inicio_cpu
+        pico_python = tracemalloc.get_traced_memory()[1] if usar_tracemalloc else None
+        if usar_tracemalloc:
+            tracemalloc.stop()
+
+    medicao = {
+        'etapa': nome,
+        'segundos': round(segundos, 4),
+        'segundos_cpu': round(segundos_cpu, 4),
+        'pico_python_mb': round(pico_python / (1024 * 1024), 2) if pico_python is not None else None,
+        'pico_rss_mb': round(pico_rss_mb(), 2),
+    }
+    return resultado, medicao
+
+
+def executar_tamanho(n, diretorio_bases, usar_tracemalloc=True):
+    """
+    Gera (ou reaproveita) a base de `n` colaboradores e mede as etapas sobre ela.
+    """
+    destino_dados = os.path.abspath(os.path.join(diretorio_bases, str(n), 'dados'))
+    inicio = time.perf_counter()
+    linhas_entrada = gerar_base(n, destino_dados)
+    segundos_geracao = time.perf_counter() - inicio
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f'bench_vr_{n}_') as trabalho:
+        # As etapas usam caminhos relativos (dados/, database/bd.sqlite)
+        os.symlink(destino_dados, os.path.join(trabalho, 'dados'))
+        os.makedirs(os.path.join(trabalho, 'database'))
+        os.chdir(trabalho)
+        try:
+            etapas = []
+            _, medicao = medir('create_tables', database.create.create_tables, usar_tracemalloc)
+            etapas.append(medicao)
+            _, medicao = medir('populate_tables', database.populate.populate_tables, usar_tracemalloc)
+            etapas.append(medicao)
+            _, medicao = medir('corrigir_base_sindicato', corrigir_base_sindicato, usar_tracemalloc)
+            etapas.append(medicao)
+            df_consolidado, medicao = medir('consolidar_e_filtrar_dados', consolidar_e_filtrar_dados, usar_tracemalloc)
+            medicao['linhas'] = len(df_consolidado) if df_consolidado is not None else None
+            etapas.append(medicao)
+            df_resultado, medicao = medir('calcular_vr', lambda: calcular_vr(df_consolidado), usar_tracemalloc)
+            medicao['linhas'] = len(df_resultado) if df_resultado is not None else None
+            etapas.append(medicao)
+        finally:
+            os.chdir(diretorio_original)
+
+    return {
+        'colaboradores': n,
+        'linhas_entrada': linhas_entrada,
+        'segundos_geracao': round(segundos_geracao, 4),
+        'etapas': etapas,
+        'segundos_total': round(sum(etapa['segundos'] for etapa in etapas), 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de VR com bases sintéticas.")
+    parser.add_argument('tamanhos', nargs='*', type=int, default=list(TAMANHOS[:3]))
+    parser.add_argument('--saida', help="Arquivo JSON de resultado (padrão: benchmarks/resultados/<data>_<commit>.json)")
+    parser.add_argument('--dados', default=DIRETORIO_BASES, help="Diretório onde as bases geradas são guardadas")
+    parser.add_argument('--sem-tracemalloc', action='store_true', help="Não mede a memória do Python (menos sobrecarga)")
+    args = parser.parse_args(argv)
+
+    commit = _commit_atual()
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'resultados': [],
+    }
+
+    for n in args.tamanhos:
+        print(f"\n=== {n} colaboradores ===")
+        resultado = executar_tamanho(n, args.dados, usar_tracemalloc=not args.sem_tracemalloc)
+        relatorio['resultados'].append(resultado)
+        for etapa in resultado['etapas']:
+            memoria = f"{etapa['pico_python_mb']:9.1f} MB" if etapa['pico_python_mb'] is not None else ' ' * 12
+            print(f"{etapa['etapa']:<28} {etapa['segundos']:9.3f} s {memoria}   RSS {etapa['pico_rss_mb']:8.1f} MB")
+        print(f"{'total':<28} {resultado['segundos_total']:9.3f} s")
+
+    saida = args.saida
+    if saida is None:
+        os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+        nome = f"{datetime.now():%Y%m%d-%H%M%S}_{commit or 'sem-commit'}.json"
+        saida = os.path.join(DIRETORIO_RESULTADOS, nome)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em: {saida}")
+    return relatorio
+
+
+if __name__ == "__main__":
+    main()
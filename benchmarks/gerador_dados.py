@@ -0,0 +1,230 @@
+# File: benchmarks/gerador_dados.py
+"""
+Gera planilhas sintéticas de RH com o mesmo leiaute dos arquivos de `dados/`
+(ATIVOS, FÉRIAS, AFASTAMENTOS, DESLIGADOS, ADMISSÃO, ESTÁGIO, APRENDIZ,
+EXTERIOR, VR MENSAL e as duas bases de sindicato), para medir o pipeline com
+1 mil a 1 milhão de colaboradores.
+
+As proporções (sindicatos, situações, férias, desligamentos etc.) seguem as
+da amostra de maio/2025; as planilhas são gravadas com calculo/exportacao.py.
+
+Uso: python -m benchmarks.gerador_dados quantidade_de_colaboradores destino [semente]
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from calculo.exportacao import salvar_xlsx
+from database.reference import read_corrections
+
+# Quantidades de colaboradores usadas no benchmark
+TAMANHOS = (1_000, 10_000, 100_000, 1_000_000)
+
+# Arquivo gravado ao lado das planilhas, usado para reaproveitar a geração
+MARCADOR = 'gerado.json'
+# Versão do gerador, gravada no marcador: ao mudar as tabelas geradas,
+# incremente-a para que as bases já gravadas sejam geradas de novo
+VERSAO_GERADOR = 2
+
+# Estados, sindicatos e valores do arquivo de correções da base de sindicatos
+_CORRECOES = read_corrections('base_sindicato_valor')
+ESTADOS = _CORRECOES['estado'].tolist()
+SINDICATOS = _CORRECOES['sindicato'].tolist()
+VALOR_ESTADO = (_CORRECOES['valor_centavos'].astype(float) / 100).tolist()
+# Paraná, Rio de Janeiro, Rio Grande do Sul, São Paulo
+PROPORCAO_SINDICATOS = [0.07, 0.07, 0.63, 0.23]
+DIAS_UTEIS_SINDICATO = [22, 21, 21, 22]
+
+SITUACOES = ['Trabalhando', 'Férias', 'Licença Maternidade', 'Auxílio Doença', 'Atestado']
+PROPORCAO_SITUACOES = [0.946, 0.042, 0.0066, 0.0044, 0.001]
+
+CARGOS = [
+    'ASSISTENTE DE BPO I', 'ASSISTENTE DE BPO II', 'ASSISTENTE DE BPO III', 'LIDER DE BPO',
+    'DESENVOLVEDOR I', 'DESENVOLVEDOR II', 'DESENVOLVEDOR III', 'AGILE MASTER',
+    'ANALISTA DE SUPORTE I', 'ANALISTA DE SUPORTE II', 'ANALISTA DE DADOS II', 'ANALISTA DE DADOS III',
+    'ANALISTA DE QUALIDADE DE SOFTWARE II', 'CONSULTOR FUNCIONAL SAP III', 'PRODUCT OWNER III',
+    'COORDENADOR DE OPERACOES I', 'COORDENADOR DE BPO', 'TECH RECRUITER II',
+    'GERENTE DE OPERACOES I', 'GERENTE DE PROJETOS II', 'DIRETOR DE OPERACOES',
+]
+# Distribuição de cauda longa, como na amostra (poucos cargos concentram a maioria)
+PROPORCAO_CARGOS = np.array([1 / (posicao + 1) for posicao in range(len(CARGOS))])
+PROPORCAO_CARGOS /= PROPORCAO_CARGOS.sum()
+
+DIAS_FERIAS = [5, 10, 15, 20, 30]
+PROPORCAO_DIAS_FERIAS = [0.26, 0.15, 0.15, 0.14, 0.30]
+
+
+def _datas(rng, inicio, fim, n):
+    dias = (pd.Timestamp(fim) - pd.Timestamp(inicio)).days + 1
+    return pd.Timestamp(inicio) + pd.to_timedelta(rng.integers(0, dias, n), unit='D')
+
+
+def _formatos_data(df):
+    """Formato de data para as colunas cujas células são datas (inclusive abaixo de uma linha de título)."""
+    return {
+        coluna: 'DD/MM/YYYY' for coluna in df.columns
+        if len(df) and isinstance(df[coluna].iloc[-1], pd.Timestamp)
+    }
+
+
+def _com_titulo(df, titulo):
+    """Repete o leiaute das bases de sindicato: uma linha de título acima do cabeçalho."""
+    cabecalho = pd.DataFrame([list(df.columns)], columns=df.columns)
+    corpo = pd.concat([cabecalho, df], ignore_index=True)
+    corpo.columns = [titulo] + [f'Unnamed: {i}' for i in range(1, len(df.columns))]
+    return corpo
+
+
+def gerar_tabelas(n, seed=42):
+    """
+    Gera os DataFrames de cada planilha para `n` colaboradores ativos.
+    Retorna um dicionário nome_do_arquivo -> DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Matrículas únicas; estagiários, aprendizes e a maioria dos desligados
+    # não aparecem em ATIVOS, como na amostra
+    n_estagio = max(1, int(n * 0.015))
+    n_aprendiz = max(1, int(n * 0.018))
+    n_desligados = max(1, int(n * 0.028))
+    matriculas = rng.permutation(np.arange(10_000, 10_000 + n + n_estagio + n_aprendiz + n_desligados))
+    ativos_mat, resto = matriculas[:n], matriculas[n:]
+    estagio_mat, resto = resto[:n_estagio], resto[n_estagio:]
+    aprendiz_mat, desligados_fora = resto[:n_aprendiz], resto[n_aprendiz:]
+
+    situacao = rng.choice(SITUACOES, n, p=PROPORCAO_SITUACOES)
+    sindicato_idx = rng.choice(len(SINDICATOS), n, p=PROPORCAO_SINDICATOS)
+    ativos = pd.DataFrame({
+        'MATRICULA': ativos_mat,
+        'EMPRESA': rng.choice([1410, 1420], n, p=[0.9, 0.1]),
+        'TITULO DO CARGO': rng.choice(CARGOS, n, p=PROPORCAO_CARGOS),
+        'DESC. SITUACAO': situacao,
+        'Sindicato': np.array(SINDICATOS, dtype=object)[sindicato_idx],
+    })
+
+    # Férias: quem está de férias e alguns outros que tiram férias ao longo
+    # do mês (uma linha por matrícula)
+    de_ferias = ativos_mat[situacao == 'Férias']
+    outros = ativos_mat[situacao != 'Férias']
+    extras = rng.choice(outros, min(len(outros), max(1, int(n * 0.002))), replace=False)
+    ferias_mat = np.concatenate([de_ferias, extras])
+    ferias = pd.DataFrame({
+        'MATRICULA': ferias_mat,
+        'DESC. SITUACAO': 'Férias',
+        'DIAS DE FÉRIAS': rng.choice(DIAS_FERIAS, len(ferias_mat), p=PROPORCAO_DIAS_FERIAS),
+    })
+
+    # Afastamentos: licenças de ATIVOS; a observação fica na quarta coluna
+    afastado = np.isin(situacao, ['Licença Maternidade', 'Auxílio Doença'])
+    n_afastados = int(afastado.sum())
+    retorno = _datas(rng, '2025-05-20', '2025-06-30', n_afastados).strftime('%d/%m')
+    afastamentos = pd.DataFrame({
+        'MATRICULA': ativos_mat[afastado],
+        'DESC. SITUACAO': situacao[afastado],
+        'na compra?': None,
+        'Unnamed: 3': np.where(
+            rng.random(n_afastados) < 0.5, 'retorno da licença em ' + retorno,
+            'retorno de férias + licença em ' + retorno
+        ),
+    })
+
+    # Desligados: a maioria já fora de ATIVOS, alguns ainda na base
+    ainda_ativos = rng.choice(ativos_mat, max(1, int(n_desligados * 0.06)), replace=False)
+    desligados_mat = np.concatenate([desligados_fora, ainda_ativos])
+    desligados = pd.DataFrame({
+        'MATRICULA': desligados_mat,
+        'DATA DEMISSÃO': _datas(rng, '2025-05-01', '2025-05-31', len(desligados_mat)),
+        'COMUNICADO DE DESLIGAMENTO': np.where(rng.random(len(desligados_mat)) < 0.92, 'OK', None),
+    })
+
+    admitidos = rng.choice(ativos_mat, max(1, int(n * 0.046)), replace=False)
+    admissoes = pd.DataFrame({
+        'MATRICULA': admitidos,
+        'Admissão': _datas(rng, '2025-04-01', '2025-04-30', len(admitidos)),
+        'Cargo': rng.choice(CARGOS, len(admitidos), p=PROPORCAO_CARGOS),
+        'Unnamed: 3': None,
+    })
+
+    estagio = pd.DataFrame({'MATRICULA': estagio_mat, 'TITULO DO CARGO': 'ESTAGIARIO', 'na compra?': None})
+    aprendiz = pd.DataFrame({'MATRICULA': aprendiz_mat, 'TITULO DO CARGO': 'APRENDIZ'})
+
+    exterior_mat = rng.choice(ativos_mat, max(1, int(n * 0.002)), replace=False)
+    exterior = pd.DataFrame({
+        'Cadastro': exterior_mat,
+        'Valor': rng.choice([28.0, 554.4, 660.0], len(exterior_mat)),
+        'Unnamed: 2': None,
+    })
+
+    base_dias_uteis = _com_titulo(
+        pd.DataFrame({'SINDICADO': SINDICATOS, 'DIAS UTEIS ': DIAS_UTEIS_SINDICATO}),
+        'BASE DIAS UTEIS DE 15/04 a 15/05'
+    )
+    base_sindicato_valor = pd.DataFrame({'ESTADO': ESTADOS, 'VALOR': VALOR_ESTADO})
+
+    # Modelo do VR mensal: uma linha de título acima do cabeçalho, como na amostra
+    dias = np.array(DIAS_UTEIS_SINDICATO)[sindicato_idx]
+    valor = np.array(VALOR_ESTADO)[sindicato_idx]
+    vr_mensal = _com_titulo(pd.DataFrame({
+        'Matricula': ativos_mat,
+        'Admissão': _datas(rng, '2015-01-01', '2025-03-31', n),
+        'Sindicato do Colaborador': ativos['Sindicato'],
+        'Competência': pd.Timestamp('2025-05-01'),
+        'Dias': dias,
+        'VALOR DIÁRIO VR': valor,
+        'TOTAL': dias * valor,
+        'Custo empresa': dias * valor * 0.8,
+        'Desconto profissional': dias * valor * 0.2,
+        'OBS GERAL': None,
+    }), '')
+
+    return {
+        'ATIVOS.xlsx': ativos,
+        'FERIAS.xlsx': ferias,
+        'AFASTAMENTOS.xlsx': afastamentos,
+        'DESLIGADOS.xlsx': desligados,
+        'ADMISSAO ABRIL.xlsx': admissoes,
+        'ESTAGIO.xlsx': estagio,
+        'APRENDIZ.xlsx': aprendiz,
+        'EXTERIOR.xlsx': exterior,
+        'Base dias uteis.xlsx': base_dias_uteis,
+        'Base sindicato x valor.xlsx': base_sindicato_valor,
+        'VR MENSAL 05.2025.xlsx': vr_mensal,
+    }
+
+
+def gerar_base(n, destino, seed=42):
+    """
+    Grava as planilhas sintéticas de `n` colaboradores em `destino`.
+
+    Se `destino` já tiver uma base gerada com os mesmos parâmetros, ela é
+    reaproveitada. Retorna um dicionário nome_do_arquivo -> número de linhas.
+    """
+    marcador = os.path.join(destino, MARCADOR)
+    parametros = {'colaboradores': n, 'semente': seed, 'versao': VERSAO_GERADOR}
+    if os.path.exists(marcador):
+        with open(marcador, encoding='utf-8') as f:
+            gerado = json.load(f)
+        if gerado['parametros'] == parametros:
+            return gerado['linhas']
+
+    os.makedirs(destino, exist_ok=True)
+    linhas = {}
+    for nome, df in gerar_tabelas(n, seed).items():
+        salvar_xlsx(df, os.path.join(destino, nome), formatos=_formatos_data(df))
+        linhas[nome] = len(df)
+
+    with open(marcador, 'w', encoding='utf-8') as f:
+        json.dump({'parametros': parametros, 'linhas': linhas}, f, ensure_ascii=False, indent=2)
+    return linhas
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    linhas = gerar_base(int(sys.argv[1]), sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 42)
+    for nome, quantidade in linhas.items():
+        print(f"{nome:<30} {quantidade:>10} linhas")
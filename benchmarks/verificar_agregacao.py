@@ -0,0 +1,92 @@
+# File: benchmarks/verificar_agregacao.py
+"""
+Verifica, de ponta a ponta, a agregação por matrícula da Etapa 4: monta um
+banco mínimo em um diretório temporário, com várias linhas de férias e de
+afastamento para o mesmo colaborador, e confere os dias calculados por
+calcular_vr.
+
+- Duas linhas de FÉRIAS da mesma matrícula são somadas.
+- Dois afastamentos sobrepostos da mesma matrícula são unidos, sem contar
+  duas vezes os dias em comum.
+- Numa competência sem dados de férias (06/2025), as férias não são
+  descontadas e a linha é marcada em 'OBS GERAL'; os afastamentos de maio
+  não entram em junho.
+
+Uso: python -m benchmarks.verificar_agregacao
+Sai com erro (AssertionError) se algum valor divergir.
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+
+import database.create
+from Etapa4_Calcular import OBS_FERIAS_SEM_PERIODO, calcular_vr
+
+SINDICATO = 'SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.'
+DIAS_UTEIS = 22
+
+# matrícula -> linhas de cada tabela
+FERIAS = [(1001, 'Férias', 5), (1001, 'Férias', 3)]
+AFASTAMENTOS = [
+    (1002, 'Auxílio Doença', 'afastado de 05/05 a 16/05'),
+    (1002, 'Auxílio Doença', 'licença 12/05/2025 - 20/05/2025'),
+]
+
+# Dias esperados por (competência, matrícula). Em 05/2025: 22 - (5 + 3)
+# para 1001 e 22 - 12 para 1002 (05/05 a 20/05 tem 12 dias úteis; contados
+# separadamente, os dois afastamentos dariam 10 + 7). Em 06/2025 valem os
+# 21 dias úteis do calendário de São Paulo, sem férias nem afastamentos.
+ESPERADO = {
+    ('05/2025', 1001): 14, ('05/2025', 1002): 10, ('05/2025', 1003): 22,
+    ('06/2025', 1001): 21, ('06/2025', 1002): 21, ('06/2025', 1003): 21,
+}
+
+
+def montar_banco():
+    """
+    Cria as tabelas em ./database/bd.sqlite e grava as bases mínimas do cálculo.
+    """
+    database.create.create_tables()
+    conn = sqlite3.connect(os.path.join('database', 'bd.sqlite'))
+    with conn:
+        conn.execute("INSERT INTO base_dias_uteis VALUES (?, ?)", (SINDICATO, DIAS_UTEIS))
+        conn.execute("INSERT INTO base_sindicato_valor VALUES ('São Paulo', 3700, ?)", (SINDICATO,))
+        conn.executemany(
+            "INSERT INTO colaboradores_elegiveis (matricula, empresa, desc_situacao, sindicato) VALUES (?, '1', 'Trabalhando', ?)",
+            [(str(matricula), SINDICATO) for competencia, matricula in ESPERADO if competencia == '05/2025']
+        )
+        conn.executemany("INSERT INTO ferias (matricula, desc_situacao, dias_de_ferias) VALUES (?, ?, ?)", FERIAS)
+        conn.executemany("INSERT INTO afastamentos (matricula, desc_situacao, observacao) VALUES (?, ?, ?)", AFASTAMENTOS)
+    conn.close()
+
+
+def verificar():
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='verificar_vr_') as trabalho:
+        # O cálculo usa caminhos relativos (database/bd.sqlite, arquivos de saída)
+        os.makedirs(os.path.join(trabalho, 'database'))
+        os.chdir(trabalho)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                montar_banco()
+                resultado = calcular_vr(competencias=['05/2025', '06/2025'])
+        finally:
+            os.chdir(diretorio_original)
+
+    assert resultado is not None, "calcular_vr não retornou resultados"
+    dias = {
+        (competencia, int(matricula)): valor
+        for competencia, matricula, valor in zip(resultado['Competência'], resultado['Matricula'], resultado['Dias'])
+    }
+    assert dias == ESPERADO, f"Dias calculados {dias}, esperados {ESPERADO}"
+
+    obs = dict(zip(zip(resultado['Competência'], resultado['Matricula'].astype(int)), resultado['OBS GERAL']))
+    assert obs[('06/2025', 1001)] == OBS_FERIAS_SEM_PERIODO, obs
+    assert obs[('05/2025', 1001)] == '' and obs[('06/2025', 1003)] == '', obs
+    print("Agregação de férias e afastamentos: ok")
+
+
+if __name__ == "__main__":
+    verificar()
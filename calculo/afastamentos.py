@@ -0,0 +1,158 @@
+# File: calculo/afastamentos.py
+import numpy as np
+import pandas as pd
+
+# Data de retorno no formato dd/mm ou dd/mm/aaaa
+PADRAO_DATA = r'(\d{2}\/\d{2}(?:\/\d{4})?)'
+# Intervalo de afastamento, por exemplo "de 05/05 a 16/05" ou "05/05/2025 - 16/05/2025"
+PADRAO_INTERVALO = PADRAO_DATA + r'\s*(?:a|à|até|ate|-)\s*' + PADRAO_DATA
+
+
+def _como_texto(observacoes):
+    """
+    Converte as observações em uma Series de texto com índice posicional.
+    """
+    texto = pd.Series(np.asarray(observacoes, dtype=object))
+    return texto.where(texto.notna(), '').astype(str)
+
+
+def _para_data(datas_texto, ano_padrao):
+    """
+    Converte textos dd/mm ou dd/mm/aaaa em datas, completando o ano ausente
+    com `ano_padrao`. Textos inválidos viram NaT.
+    """
+    datas_texto = datas_texto.astype(object)
+    sem_ano = datas_texto.str.len() == 5
+    completo = datas_texto.where(~sem_ano, datas_texto + f'/{ano_padrao}')
+    return pd.to_datetime(completo, format='%d/%m/%Y', errors='coerce').to_numpy().astype('datetime64[D]')
+
+
+def _chaves_por_linha(chaves, n):
+    if chaves is None or np.ndim(chaves) == 0:
+        return np.full(n, chaves, dtype=object)
+    return np.asarray(chaves, dtype=object)
+
+
+def _contar(inicio, fim, calendario, chaves):
+    if calendario is None:
+        return np.busday_count(inicio, fim)
+    return calendario.dias_uteis(inicio, fim, chaves)
+
+
+def intervalos_afastamento(observacoes, ano_padrao):
+    """
+    Extrai os intervalos de afastamento [inicio, fim) de cada observação.
+
+    Observações com intervalos ("de 05/05 a 16/05") geram um intervalo por
+    trecho, com as duas pontas incluídas. Nas demais, a primeira data
+    encontrada é a data de retorno e o intervalo vai do primeiro dia do mês
+    até ela (sem incluí-la). Datas sem ano usam `ano_padrao`. Retorna um
+    DataFrame com as colunas 'linha' (posição da observação), 'inicio' e 'fim'.
+    """
+    texto = _como_texto(observacoes)
+    n = len(texto)
+    partes = []
+
+    # --- Intervalos: uma linha por intervalo encontrado ---
+    com_intervalo = np.zeros(n, dtype=bool)
+    # Um intervalo tem ao menos duas barras; o filtro evita o extractall nas demais linhas
+    candidatas = texto[texto.str.count('/').to_numpy() >= 2] if n else texto
+    intervalos = candidatas.str.extractall(PADRAO_INTERVALO)
+    if not intervalos.empty:
+        linhas = intervalos.index.get_level_values(0).to_numpy()
+        com_intervalo[linhas] = True
+        inicio = _para_data(intervalos[0].reset_index(drop=True), ano_padrao)
+        fim = _para_data(intervalos[1].reset_index(drop=True), ano_padrao) + 1
+        partes.append(pd.DataFrame({'linha': linhas, 'inicio': inicio, 'fim': fim}))
+
+    # --- Data única de retorno ---
+    if n:
+        data_retorno = _para_data(texto.str.extract(PADRAO_DATA, expand=False), ano_padrao)
+        usar = ~com_intervalo
+        partes.append(pd.DataFrame({
+            'linha': np.flatnonzero(usar),
+            'inicio': data_retorno[usar].astype('datetime64[M]').astype('datetime64[D]'),
+            'fim': data_retorno[usar],
+        }))
+
+    if not partes:
+        return pd.DataFrame({
+            'linha': np.zeros(0, dtype=np.int64),
+            'inicio': np.zeros(0, dtype='datetime64[D]'),
+            'fim': np.zeros(0, dtype='datetime64[D]'),
+        })
+    resultado = pd.concat(partes, ignore_index=True)
+    validos = resultado['inicio'].notna() & resultado['fim'].notna() & (resultado['fim'] > resultado['inicio'])
+    return resultado[validos].reset_index(drop=True)
+
+
+def calcular_dias_afastado(observacoes, ano_padrao, calendario=None, chaves=None):
+    """
+    Calcula os dias úteis de afastamento a partir do texto das observações,
+    de uma só vez para a coluna inteira.
+
+    Os intervalos de cada observação vêm de intervalos_afastamento e seus
+    dias úteis são somados; uma observação pode ter vários intervalos. Com
+    `calendario` (CalendarioDiasUteis), os feriados de `chaves` (sindicato de
+    cada linha) são considerados. Retorna um vetor de inteiros alinhado às
+    observações.
+    """
+    n = len(observacoes)
+    chaves = _chaves_por_linha(chaves, n)
+    intervalos = intervalos_afastamento(observacoes, ano_padrao)
+    linhas = intervalos['linha'].to_numpy()
+
+    dias = np.zeros(n, dtype=np.int64)
+    contagem = _contar(
+        intervalos['inicio'].to_numpy().astype('datetime64[D]'),
+        intervalos['fim'].to_numpy().astype('datetime64[D]'),
+        calendario, chaves[linhas]
+    )
+    np.add.at(dias, linhas, contagem)
+    return dias
+
+
+def dias_afastado_por_matricula(matriculas, observacoes, ano_padrao, calendario=None, chaves=None, periodo=None):
+    """
+    Soma os dias úteis de afastamento por matrícula, unindo antes os
+    intervalos sobrepostos de linhas diferentes da mesma matrícula, para que
+    um mesmo dia não seja descontado duas vezes.
+
+    Com `periodo` (par de datas [inicio, fim), como o mês de uma
+    competência), só os dias dos intervalos que caem dentro dele são contados.
+
+    Retorna um DataFrame com uma linha por matrícula: 'matricula' e 'dias_afastado'.
+    """
+    matriculas = pd.Series(matriculas).reset_index(drop=True)
+    chaves = _chaves_por_linha(chaves, len(matriculas))
+    intervalos = intervalos_afastamento(observacoes, ano_padrao)
+    intervalos['matricula'] = matriculas.iloc[intervalos['linha'].to_numpy()].to_numpy()
+    intervalos['chave'] = chaves[intervalos['linha'].to_numpy()]
+
+    # Une intervalos sobrepostos ou contíguos: um novo grupo começa quando o
+    # início passa do maior fim visto até então na mesma matrícula
+    intervalos = intervalos.sort_values(['matricula', 'inicio'], kind='stable').reset_index(drop=True)
+    fim_anterior = intervalos.groupby('matricula')['fim'].cummax().shift()
+    mesma_matricula = intervalos['matricula'].eq(intervalos['matricula'].shift())
+    novo_grupo = ~mesma_matricula | (intervalos['inicio'] > fim_anterior)
+    intervalos['grupo'] = novo_grupo.cumsum()
+    unidos = intervalos.groupby('grupo').agg(
+        matricula=('matricula', 'first'), chave=('chave', 'first'),
+        inicio=('inicio', 'min'), fim=('fim', 'max'),
+    )
+    if periodo is not None:
+        inicio_periodo, fim_periodo = (np.datetime64(pd.Timestamp(data).date(), 'D') for data in periodo)
+        unidos['inicio'] = unidos['inicio'].clip(lower=inicio_periodo)
+        unidos['fim'] = unidos['fim'].clip(upper=fim_periodo)
+        unidos = unidos[unidos['fim'] > unidos['inicio']]
+
+    unidos['dias_afastado'] = _contar(
+        unidos['inicio'].to_numpy().astype('datetime64[D]'),
+        unidos['fim'].to_numpy().astype('datetime64[D]'),
+        calendario, unidos['chave'].to_numpy()
+    )
+    por_matricula = unidos.groupby('matricula', sort=False)['dias_afastado'].sum()
+
+    resultado = pd.DataFrame({'matricula': matriculas.drop_duplicates().reset_index(drop=True)})
+    resultado['dias_afastado'] = resultado['matricula'].map(por_matricula).fillna(0).astype(np.int64)
+    return resultado
@@ -0,0 +1,59 @@
+# File: calculo/agregacao.py
+import pandas as pd
+
+from calculo.tipos import alinhar_chaves
+
+
+def agregar_ferias(df_ferias):
+    """
+    Reduz a tabela de férias a uma linha por matrícula, somando os dias de
+    férias de todas as linhas do colaborador.
+
+    Retorna um DataFrame com as colunas 'matricula' e 'dias_de_ferias'.
+    """
+    dias = pd.to_numeric(df_ferias['dias_de_ferias'], errors='coerce')
+    return (
+        dias.groupby(df_ferias['matricula'], sort=False).sum()
+        .rename('dias_de_ferias')
+        .reset_index()
+    )
+
+
+def agregar_desligados(df_desligados):
+    """
+    Reduz a tabela de desligados a uma linha por matrícula, mantendo o
+    desligamento mais recente (maior data de demissão) de cada colaborador.
+
+    Retorna um DataFrame com as colunas 'matricula', 'data_demissao' e
+    'comunicado_de_desligamento'.
+    """
+    colunas = ['matricula', 'data_demissao', 'comunicado_de_desligamento']
+    return (
+        df_desligados[colunas]
+        .sort_values('data_demissao', kind='stable', na_position='first')
+        .drop_duplicates('matricula', keep='last')
+        .sort_index()
+        .reset_index(drop=True)
+    )
+
+
+def mesclar_sem_expansao(esquerda, direita, on, descricao, **kwargs):
+    """
+    Faz um merge à esquerda garantindo que cada linha de `esquerda` continua
+    sendo uma única linha no resultado.
+
+    Se `direita` tiver chaves repetidas que casam com `esquerda`, o merge
+    multiplicaria as linhas do colaborador e o VR seria pago mais de uma vez;
+    nesse caso é levantado um ValueError citando `descricao`, em vez de seguir
+    com o cálculo.
+    """
+    esquerda, direita = alinhar_chaves(esquerda, direita, on)
+    resultado = pd.merge(esquerda, direita, on=on, how='left', **kwargs)
+    if len(resultado) != len(esquerda):
+        repetidas = direita.loc[direita.duplicated(on, keep=False), on]
+        exemplos = repetidas.drop_duplicates().head(5).values.tolist()
+        raise ValueError(
+            f"Junção com {descricao} multiplicaria linhas ({len(esquerda)} -> {len(resultado)}): "
+            f"chaves repetidas em {on}, por exemplo {exemplos}."
+        )
+    return resultado
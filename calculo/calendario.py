@@ -0,0 +1,153 @@
+# File: calculo/calendario.py
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Feriados nacionais de data fixa (mês, dia)
+FERIADOS_NACIONAIS = [
+    (1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (11, 20), (12, 25)
+]
+
+# Feriados estaduais de data fixa, indexados pelo nome do estado como aparece
+# na tabela base_sindicato_valor.
+FERIADOS_ESTADUAIS = {
+    'Paraná': [(12, 19)],
+    'Rio de Janeiro': [(4, 23)],
+    'Rio Grande do Sul': [(9, 20)],
+    'São Paulo': [(7, 9)],
+}
+
+
+def calcular_pascoa(ano):
+    """
+    Retorna a data da Páscoa (algoritmo de Meeus/Jones/Butcher).
+    """
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+class CalendarioDiasUteis:
+    """
+    Calendário de dias úteis com feriados nacionais, estaduais e específicos
+    de sindicato.
+
+    Para cada (chave, ano) é pré-calculado um vetor de somas acumuladas de dias
+    úteis, de modo que a contagem entre duas datas é a diferença de dois
+    prefixos. A semântica é a mesma de np.busday_count: conta os dias úteis no
+    intervalo [inicio, fim).
+    """
+
+    def __init__(self, sindicato_estado=None, feriados_extras=None, weekmask='1111100'):
+        # sindicato_estado: dict sindicato -> estado, usado para resolver a chave
+        # feriados_extras: dict estado ou sindicato -> lista de datas adicionais
+        self.sindicato_estado = dict(sindicato_estado or {})
+        self.feriados_extras = {k: list(v) for k, v in (feriados_extras or {}).items()}
+        self.weekmask = weekmask
+        self._anos = {}
+        self._prefixos = {}
+
+    @classmethod
+    def from_base_sindicato(cls, df_base_sindicato_valor, **kwargs):
+        """
+        Cria o calendário usando o mapeamento sindicato -> estado da tabela
+        base_sindicato_valor.
+        """
+        base = df_base_sindicato_valor.dropna(subset=['sindicato', 'estado'])
+        sindicato_estado = dict(zip(
+            base['sindicato'].astype(str).str.strip(),
+            base['estado'].astype(str).str.strip()
+        ))
+        return cls(sindicato_estado=sindicato_estado, **kwargs)
+
+    def feriados(self, ano, chave=None):
+        """
+        Lista os feriados do ano para a chave (sindicato ou estado).
+        """
+        pascoa = calcular_pascoa(ano)
+        datas = [date(ano, mes, dia) for mes, dia in FERIADOS_NACIONAIS]
+        # Sexta-feira Santa
+        datas.append(pascoa - timedelta(days=2))
+
+        estado = self.sindicato_estado.get(chave, chave)
+        datas += [date(ano, mes, dia) for mes, dia in FERIADOS_ESTADUAIS.get(estado, [])]
+        for extra in (chave, estado):
+            datas += [pd.Timestamp(d).date() for d in self.feriados_extras.get(extra, [])
+                      if pd.Timestamp(d).year == ano]
+        return sorted(set(datas))
+
+    def _acumulado_ano(self, ano, chave):
+        """
+        Vetor acumulado do ano: posição i = dias úteis em [1º de janeiro, 1º de janeiro + i).
+        """
+        if (chave, ano) not in self._anos:
+            dias = np.arange(np.datetime64(f'{ano}-01-01'), np.datetime64(f'{ano + 1}-01-01'))
+            uteis = np.is_busday(dias, weekmask=self.weekmask, holidays=self.feriados(ano, chave))
+            self._anos[(chave, ano)] = np.concatenate(([0], np.cumsum(uteis, dtype=np.int64)))
+        return self._anos[(chave, ano)]
+
+    def _prefixo(self, chave, ano_inicial, ano_final):
+        """
+        Retorna (data_base, prefixo) cobrindo ao menos os anos pedidos,
+        concatenando os vetores anuais quando o intervalo precisa crescer.
+        """
+        atual = self._prefixos.get(chave)
+        if atual is not None and atual[0] <= ano_inicial and atual[1] >= ano_final:
+            return atual[2], atual[3]
+        if atual is not None:
+            ano_inicial, ano_final = min(ano_inicial, atual[0]), max(ano_final, atual[1])
+
+        partes, deslocamento = [np.zeros(1, dtype=np.int64)], 0
+        for ano in range(ano_inicial, ano_final + 1):
+            acumulado = self._acumulado_ano(ano, chave)
+            partes.append(acumulado[1:] + deslocamento)
+            deslocamento += acumulado[-1]
+        data_base = np.datetime64(f'{ano_inicial}-01-01')
+        prefixo = np.concatenate(partes)
+        self._prefixos[chave] = (ano_inicial, ano_final, data_base, prefixo)
+        return data_base, prefixo
+
+    def _contar(self, inicio, fim, chave):
+        anos = np.concatenate((inicio, fim)).astype('datetime64[Y]').astype(int) + 1970
+        data_base, prefixo = self._prefixo(chave, int(anos.min()), int(anos.max()))
+        # Como np.busday_count, intervalos invertidos contam (fim, inicio] com sinal negativo
+        invertido = inicio > fim
+        inicio = (inicio + invertido - data_base).astype(int)
+        fim = (fim + invertido - data_base).astype(int)
+        return prefixo[fim] - prefixo[inicio]
+
+    def dias_uteis(self, inicio, fim, chave=None):
+        """
+        Conta os dias úteis em [inicio, fim) para cada par de datas.
+
+        `inicio` e `fim` podem ser datas isoladas ou vetores de datas sem NaT.
+        `chave` pode ser um único sindicato/estado ou um vetor com uma chave por
+        linha; None usa apenas os feriados nacionais.
+        """
+        escalar = np.ndim(inicio) == 0 and np.ndim(fim) == 0
+        inicio = np.atleast_1d(np.asarray(inicio, dtype='datetime64[D]'))
+        fim = np.atleast_1d(np.asarray(fim, dtype='datetime64[D]'))
+        inicio, fim = np.broadcast_arrays(inicio, fim)
+        if inicio.size == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        if chave is None or np.ndim(chave) == 0:
+            resultado = self._contar(inicio, fim, chave)
+        else:
+            chaves = pd.Series(np.asarray(chave, dtype=object)).fillna('').to_numpy()
+            resultado = np.zeros(inicio.shape, dtype=np.int64)
+            # Poucos sindicatos distintos: uma subtração vetorizada por chave
+            for valor in pd.unique(chaves):
+                mascara = chaves == valor
+                resultado[mascara] = self._contar(inicio[mascara], fim[mascara], valor or None)
+
+        return int(resultado[0]) if escalar else resultado
@@ -0,0 +1,63 @@
+# File: calculo/desligamento.py
+import numpy as np
+import pandas as pd
+
+
+def aplicar_regra_desligamento(df, calendario=None, inicio_competencia=None):
+    """
+    Aplica a regra de desligamento sobre a coluna inteira de uma só vez.
+
+    Espera as colunas 'comunicado_de_desligamento', 'data_demissao' e
+    'dias_uteis_elegiveis'. Para comunicados 'OK' com demissão até o dia 15
+    o colaborador não recebe VR; depois do dia 15 os dias elegíveis são
+    proporcionais aos dias úteis restantes do mês. Retorna uma Series com os
+    dias úteis elegíveis ajustados, alinhada ao índice de `df`.
+
+    Se `calendario` (CalendarioDiasUteis) for informado, os dias úteis são
+    contados com os feriados do sindicato de cada linha (coluna 'sindicato');
+    caso contrário, usa a semana de segunda a sexta sem feriados.
+
+    Se `inicio_competencia` (uma data ou uma por linha) for informado, a regra
+    considera o mês da competência: demissões em meses anteriores zeram os
+    dias, demissões em meses posteriores não alteram os dias e só demissões
+    no próprio mês passam pela regra do dia 15.
+    """
+    dias_elegiveis = df['dias_uteis_elegiveis'].astype(float)
+    resultado = dias_elegiveis.to_numpy(copy=True)
+
+    datas = pd.to_datetime(df['data_demissao'], errors='coerce')
+    comunicado_ok = df['comunicado_de_desligamento'].eq('OK').fillna(False).to_numpy(dtype=bool)
+    aplicar = comunicado_ok & datas.notna().to_numpy()
+
+    if inicio_competencia is not None:
+        mes_competencia = np.broadcast_to(
+            np.asarray(pd.to_datetime(inicio_competencia), dtype='datetime64[M]'), len(df)
+        )
+        mes_demissao = datas.to_numpy().astype('datetime64[M]')
+        desligado_antes = aplicar & (mes_demissao < mes_competencia)
+        resultado[desligado_antes] = 0.0
+        aplicar = aplicar & (mes_demissao == mes_competencia)
+
+    if aplicar.any():
+        # Trunca para dias e calcula o início e o fim do mês de cada demissão
+        data_demissao = datas.to_numpy()[aplicar].astype('datetime64[D]')
+        mes = data_demissao.astype('datetime64[M]')
+        inicio_mes = mes.astype('datetime64[D]')
+        fim_mes = (mes + 1).astype('datetime64[D]') - 1
+
+        if calendario is not None:
+            chave = df['sindicato'].to_numpy()[aplicar] if 'sindicato' in df.columns else None
+            dias_uteis_restantes = calendario.dias_uteis(data_demissao, fim_mes, chave)
+            dias_totais_uteis = calendario.dias_uteis(inicio_mes, fim_mes, chave)
+        else:
+            dias_uteis_restantes = np.busday_count(data_demissao, fim_mes)
+            dias_totais_uteis = np.busday_count(inicio_mes, fim_mes)
+        proporcao = np.divide(
+            dias_uteis_restantes, dias_totais_uteis,
+            out=np.zeros(len(data_demissao)), where=dias_totais_uteis > 0
+        )
+
+        dia = (data_demissao - mes.astype('datetime64[D]')).astype(int) + 1
+        resultado[aplicar] = np.where(dia <= 15, 0.0, resultado[aplicar] * proporcao)
+
+    return pd.Series(resultado, index=df.index, name='dias_uteis_elegiveis')
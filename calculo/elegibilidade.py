@@ -0,0 +1,160 @@
+# File: calculo/elegibilidade.py
+import re
+
+import numpy as np
+import pandas as pd
+
+from calculo.tipos import alinhar_chaves
+
+
+class RegraMatricula:
+    """
+    Exclui os colaboradores cuja matrícula aparece na tabela `tabela`.
+    """
+
+    def __init__(self, nome, tabela):
+        self.nome = nome
+        self.tabela = tabela
+
+    def condicao_sql(self, alias='a'):
+        return f"EXISTS (SELECT 1 FROM {self.tabela} x WHERE x.matricula = TRIM({alias}.matricula))"
+
+
+class RegraCargo:
+    """
+    Exclui os colaboradores cujo título do cargo contém `trecho`, sem
+    diferenciar maiúsculas de minúsculas. Títulos vazios não são excluídos.
+    """
+
+    def __init__(self, nome, trecho):
+        self.nome = nome
+        self.trecho = trecho
+        self.padrao = re.compile(re.escape(trecho), re.IGNORECASE)
+
+    def condicao_sql(self, alias='a'):
+        trecho = self.trecho.replace("'", "''")
+        return f"COALESCE({alias}.titulo_do_cargo, '') LIKE '%{trecho}%'"
+
+
+# Regras de exclusão da Etapa 3, na ordem do relatório de exclusões
+REGRAS_EXCLUSAO = (
+    RegraMatricula('aprendiz', 'aprendiz'),
+    RegraMatricula('estagio', 'estagio'),
+    RegraMatricula('afastamentos', 'afastamentos'),
+    RegraMatricula('exterior', 'exterior'),
+    RegraCargo('diretor', 'diretor'),
+)
+
+
+class MotorExclusao:
+    """
+    Aplica um conjunto de regras de exclusão aos ativos em uma única passada.
+
+    Cada regra ocupa um bit de uma máscara. Em `compilar`, as matrículas de
+    todas as regras de matrícula viram um único índice hash matrícula ->
+    máscara; as regras de cargo são avaliadas uma vez por título distinto
+    (poucos, comparados aos colaboradores) e guardadas para as próximas
+    chamadas. Em `aplicar`, cada colaborador é consultado uma vez no índice
+    e uma vez na tabela de títulos, qualquer que seja o número de regras.
+    """
+
+    def __init__(self, regras=REGRAS_EXCLUSAO):
+        if len(regras) > 63:
+            raise ValueError("São aceitas no máximo 63 regras de exclusão.")
+        self.regras = list(regras)
+        self._mascaras_matricula = pd.Series([], dtype=np.int64)
+        self._mascaras_titulo = {}
+
+    def tabelas(self):
+        """
+        Tabelas de matrículas usadas pelas regras, na ordem das regras.
+        """
+        return [regra.tabela for regra in self.regras if isinstance(regra, RegraMatricula)]
+
+    def compilar(self, tabelas):
+        """
+        Monta o índice de matrículas a partir de `tabelas` (nome da tabela ->
+        DataFrame com a coluna 'matricula'). Devolve o próprio motor.
+        """
+        partes = []
+        for bit, regra in enumerate(self.regras):
+            if isinstance(regra, RegraMatricula):
+                matriculas = pd.Series(tabelas[regra.tabela]['matricula']).dropna().unique()
+                partes.append(pd.Series(np.int64(1) << bit, index=matriculas))
+        if partes:
+            # Cada matrícula aparece no máximo uma vez por regra, então a soma
+            # dos bits é o mesmo que o "ou" entre eles
+            self._mascaras_matricula = pd.concat(partes).groupby(level=0).sum().astype(np.int64)
+        return self
+
+    def _mascaras_matriculas(self, matriculas):
+        indice = self._mascaras_matricula.index
+        if len(indice) == 0:
+            return np.zeros(len(matriculas), dtype=np.int64)
+        # Matrículas inteiras de um lado e texto do outro são comparadas como texto
+        if pd.api.types.is_numeric_dtype(matriculas.dtype) != pd.api.types.is_numeric_dtype(indice.dtype):
+            esquerda, direita = alinhar_chaves(
+                pd.DataFrame({'matricula': matriculas}), pd.DataFrame({'matricula': indice}), 'matricula'
+            )
+            matriculas, indice = esquerda['matricula'], pd.Index(direita['matricula'])
+        posicoes = indice.get_indexer(matriculas)
+        mascaras = self._mascaras_matricula.to_numpy()
+        return np.where(posicoes >= 0, mascaras[posicoes], 0)
+
+    def _mascara_titulo(self, titulo):
+        if titulo not in self._mascaras_titulo:
+            mascara = 0
+            for bit, regra in enumerate(self.regras):
+                if isinstance(regra, RegraCargo) and regra.padrao.search(str(titulo)):
+                    mascara |= 1 << bit
+            self._mascaras_titulo[titulo] = mascara
+        return self._mascaras_titulo[titulo]
+
+    def _mascaras_titulos(self, titulos):
+        if not any(isinstance(regra, RegraCargo) for regra in self.regras):
+            return np.zeros(len(titulos), dtype=np.int64)
+        codigos, distintos = pd.factorize(titulos)
+        if len(distintos) == 0:
+            return np.zeros(len(titulos), dtype=np.int64)
+        por_titulo = np.array([self._mascara_titulo(titulo) for titulo in distintos], dtype=np.int64)
+        return np.where(codigos >= 0, por_titulo[codigos], 0)
+
+    def aplicar(self, ativos):
+        """
+        Avalia as regras sobre `ativos` (colunas 'matricula' e
+        'titulo_do_cargo').
+
+        Retorna (elegíveis, exclusões): a máscara booleana das linhas que não
+        caem em nenhuma regra e um dicionário regra -> número de
+        colaboradores que ela exclui. Um colaborador que cai em duas regras
+        conta para as duas.
+        """
+        mascaras = self._mascaras_matriculas(ativos['matricula'])
+        if 'titulo_do_cargo' in ativos.columns:
+            mascaras = mascaras | self._mascaras_titulos(ativos['titulo_do_cargo'])
+
+        # Contagem por máscara distinta: o número de regras não multiplica as passadas
+        valores, quantidades = np.unique(mascaras, return_counts=True)
+        exclusoes = {
+            regra.nome: int(quantidades[(valores & (1 << bit)) != 0].sum())
+            for bit, regra in enumerate(self.regras)
+        }
+        return mascaras == 0, exclusoes
+
+
+def consulta_exclusoes_sql(regras=REGRAS_EXCLUSAO, alias='a'):
+    """
+    Condição SQL que exclui os ativos (tabela com o apelido `alias`) que caem
+    em alguma das regras.
+    """
+    return ' AND '.join(f"NOT ({regra.condicao_sql(alias)})" for regra in regras)
+
+
+def contar_exclusoes_sql(conn, regras=REGRAS_EXCLUSAO):
+    """
+    Conta, em uma única consulta sobre a tabela ativos, quantos colaboradores
+    cada regra exclui. Retorna um dicionário regra -> quantidade.
+    """
+    somas = ', '.join(f"COALESCE(SUM({regra.condicao_sql('a')}), 0)" for regra in regras)
+    linha = conn.execute(f"SELECT {somas} FROM ativos a").fetchone()
+    return {regra.nome: int(quantidade) for regra, quantidade in zip(regras, linha)}
@@ -0,0 +1,251 @@
+# File: calculo/exportacao.py
+import importlib.util
+import os
+
+import pandas as pd
+
+# Formato numérico aplicado às células de cada coluna do resultado. Os valores
+# continuam numéricos na planilha; o Excel exibe a vírgula decimal conforme a
+# configuração regional de quem abre o arquivo.
+FORMATOS_COLUNA = {
+    'Admissão': 'DD/MM/YYYY',
+    'Dias': '0.00',
+    'VALOR DIÁRIO VR': '#,##0.00',
+    'TOTAL': '#,##0.00',
+    'Custo empresa': '#,##0.00',
+    'Desconto profissional': '#,##0.00',
+}
+
+# Formatos aceitos como saída adicional, além do XLSX
+FORMATOS_EXTRAS = ('csv', 'parquet')
+
+
+def parquet_disponivel():
+    """
+    Indica se há um motor Parquet (pyarrow ou fastparquet, opcionais) instalado.
+    """
+    return any(importlib.util.find_spec(motor) is not None for motor in ('pyarrow', 'fastparquet'))
+
+
+def xlsxwriter_disponivel():
+    """
+    Indica se o gravador xlsxwriter (mais rápido, opcional) está instalado.
+    """
+    return importlib.util.find_spec('xlsxwriter') is not None
+
+
+def _linhas(df):
+    # Nulos (NaN, NaT) viram None, gravados como células vazias
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+class EscritorXlsx:
+    """
+    Grava um XLSX em partes: o cabeçalho com `colunas` é escrito na abertura
+    e cada chamada a `escrever` acrescenta as linhas de um DataFrame, sem
+    guardar na memória as linhas já gravadas. `fechar` conclui o arquivo.
+
+    `formatos` e `motor` têm o mesmo sentido que em salvar_xlsx.
+    """
+
+    def __init__(self, caminho, colunas, formatos=None, nome_planilha='Sheet1', motor='auto'):
+        formatos = FORMATOS_COLUNA if formatos is None else formatos
+        if motor == 'auto':
+            motor = 'xlsxwriter' if xlsxwriter_disponivel() else 'openpyxl'
+        if motor not in ('xlsxwriter', 'openpyxl'):
+            raise ValueError(f"Motor de gravação desconhecido: {motor}. Use 'auto', 'xlsxwriter' ou 'openpyxl'.")
+
+        self.caminho = caminho
+        self.colunas = list(colunas)
+        self.motor = motor
+        self.linhas = 0
+
+        if motor == 'xlsxwriter':
+            import xlsxwriter
+
+            self._workbook = xlsxwriter.Workbook(caminho, {'constant_memory': True})
+            self._sheet = self._workbook.add_worksheet(nome_planilha)
+            self._sheet.write_row(0, 0, self.colunas)
+            estilos = {formato: self._workbook.add_format({'num_format': formato}) for formato in set(formatos.values())}
+            self._estilo_coluna = [estilos.get(formatos.get(coluna)) for coluna in self.colunas]
+        else:
+            from openpyxl import Workbook
+
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet(nome_planilha)
+            self._sheet.append(self.colunas)
+            self._colunas_formatadas = [
+                (posicao, formatos[coluna]) for posicao, coluna in enumerate(self.colunas) if coluna in formatos
+            ]
+
+    def escrever(self, df):
+        linhas = _linhas(df[self.colunas])
+        if self.motor == 'xlsxwriter':
+            for numero, linha in enumerate(linhas, start=self.linhas + 1):
+                for posicao, valor in enumerate(linha):
+                    if valor is not None:
+                        self._sheet.write(numero, posicao, valor, self._estilo_coluna[posicao])
+        else:
+            from openpyxl.cell import WriteOnlyCell
+
+            for linha in linhas:
+                linha = list(linha)
+                for posicao, formato in self._colunas_formatadas:
+                    if linha[posicao] is not None:
+                        celula = WriteOnlyCell(self._sheet, value=linha[posicao])
+                        celula.number_format = formato
+                        linha[posicao] = celula
+                self._sheet.append(linha)
+        self.linhas += len(df)
+
+    def fechar(self):
+        if self.motor == 'xlsxwriter':
+            self._workbook.close()
+        else:
+            self._workbook.save(self.caminho)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+
+def salvar_xlsx(df, caminho, formatos=None, nome_planilha='Sheet1', motor='auto'):
+    """
+    Grava o DataFrame em XLSX linha a linha, sem montar o modelo de células
+    da planilha inteira como o to_excel faz, então a memória não cresce com o
+    número de linhas.
+
+    As colunas de `formatos` (padrão: FORMATOS_COLUNA) recebem o formato
+    numérico nas células; as demais são gravadas como estão. `motor` escolhe
+    o gravador: 'xlsxwriter' (modo constant_memory), 'openpyxl' (planilha
+    somente escrita) ou 'auto', que usa o xlsxwriter quando instalado.
+    """
+    with EscritorXlsx(caminho, df.columns, formatos, nome_planilha, motor) as escritor:
+        escritor.escrever(df)
+
+
+class _EscritorCsv:
+    """CSV gravado em partes; vírgula como separador e ponto decimal."""
+
+    def __init__(self, caminho, colunas):
+        self.caminho = caminho
+        self.colunas = list(colunas)
+        self._arquivo = open(caminho, 'w', newline='', encoding='utf-8')
+        pd.DataFrame(columns=self.colunas).to_csv(self._arquivo, index=False)
+
+    def escrever(self, df):
+        df[self.colunas].to_csv(self._arquivo, index=False, header=False)
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class _EscritorParquet:
+    """
+    Parquet gravado em partes: com o pyarrow, um grupo de linhas por parte;
+    só com o fastparquet, cada parte é acrescentada ao arquivo.
+    """
+
+    def __init__(self, caminho, colunas):
+        self.caminho = caminho
+        self.colunas = list(colunas)
+        self._pyarrow = importlib.util.find_spec('pyarrow') is not None
+        self._writer = None
+        self._schema = None
+        self._iniciado = False
+
+    def escrever(self, df):
+        df = df[self.colunas]
+        if self._pyarrow:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabela = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = tabela.schema
+                self._writer = pq.ParquetWriter(self.caminho, self._schema)
+            self._writer.write_table(tabela)
+        else:
+            df.to_parquet(self.caminho, engine='fastparquet', index=False, append=self._iniciado)
+        self._iniciado = True
+
+    def fechar(self):
+        if self._writer is not None:
+            self._writer.close()
+        elif not self._iniciado:
+            pd.DataFrame(columns=self.colunas).to_parquet(self.caminho, index=False)
+
+
+def _escritores_extras(caminho, colunas, formatos):
+    base_path, _ = os.path.splitext(caminho)
+    escritores = []
+    for formato in formatos:
+        if formato not in FORMATOS_EXTRAS:
+            raise ValueError(f"Formato de saída desconhecido: {formato}. Use um de {FORMATOS_EXTRAS}.")
+        destino = f"{base_path}.{formato}"
+        if formato == 'csv':
+            escritores.append(_EscritorCsv(destino, colunas))
+        elif not parquet_disponivel():
+            print("Aviso: instale pyarrow ou fastparquet para gerar a saída em Parquet.")
+        else:
+            escritores.append(_EscritorParquet(destino, colunas))
+    return escritores
+
+
+class EscritorResultado:
+    """
+    Grava o resultado do cálculo em partes: o XLSX em `caminho` e as saídas
+    extras pedidas ('csv' e/ou 'parquet', ao lado dele, com a extensão de
+    cada formato). Sem um motor Parquet instalado, o Parquet é ignorado com
+    um aviso.
+
+    Com `particionar`, cada competência vai para arquivos próprios
+    (calculo_vr_final_MM-AAAA.xlsx...), abertos quando a competência aparece
+    pela primeira vez. `fechar` conclui todos os arquivos e retorna um
+    dicionário competência (ou None, sem partição) -> arquivos gravados.
+    """
+
+    def __init__(self, caminho, colunas, saidas_extras=None, particionar=False):
+        self.caminho = caminho
+        self.colunas = list(colunas)
+        self.saidas_extras = list(saidas_extras or [])
+        self.particionar = particionar
+        self._escritores = {}
+        if not particionar:
+            self._abrir(None, caminho)
+
+    def _abrir(self, competencia, caminho):
+        self._escritores[competencia] = (
+            [EscritorXlsx(caminho, self.colunas)] + _escritores_extras(caminho, self.colunas, self.saidas_extras)
+        )
+
+    def escrever(self, df):
+        if not self.particionar:
+            partes = [(None, df)]
+        else:
+            partes = df.groupby('Competência', sort=False, observed=True)
+        for competencia, parte in partes:
+            if competencia not in self._escritores:
+                base_path, extensao = os.path.splitext(self.caminho)
+                self._abrir(competencia, f"{base_path}_{competencia.replace('/', '-')}{extensao}")
+            for escritor in self._escritores[competencia]:
+                escritor.escrever(parte)
+
+    def fechar(self):
+        arquivos = {}
+        for competencia, escritores in self._escritores.items():
+            for escritor in escritores:
+                escritor.fechar()
+            arquivos[competencia] = [escritor.caminho for escritor in escritores]
+        self._escritores = {}
+        return arquivos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
@@ -0,0 +1,129 @@
+# File: calculo/historico.py
+import numpy as np
+import pandas as pd
+
+from calculo.agregacao import mesclar_sem_expansao
+from calculo.tipos import para_matricula
+
+# Versão das regras de cálculo, incluída na impressão das entradas. Ao mudar
+# uma regra (ou os feriados do calendário), incremente-a para que o cálculo
+# incremental refaça todos os colaboradores.
+VERSAO_CALCULO = 2
+
+# Colunas do resultado -> colunas da tabela vr_calculado
+COLUNAS_HISTORICO = {
+    'Competência': 'competencia',
+    'Matricula': 'matricula',
+    'Admissão': 'admissao',
+    'Sindicato do Colaborador': 'sindicato_do_colaborador',
+    'Dias': 'dias',
+    'VALOR DIÁRIO VR': 'valor_diario_vr',
+    'TOTAL': 'total',
+    'Custo empresa': 'custo_empresa',
+    'Desconto profissional': 'desconto_profissional',
+    'OBS GERAL': 'obs_geral',
+}
+
+# Colunas da base consolidada que entram na impressão; estado, valor e dias
+# úteis vêm das bases de sindicato
+COLUNAS_PRINCIPAL = ['matricula', 'empresa', 'titulo_do_cargo', 'desc_situacao', 'sindicato']
+
+# Colunas comparadas no relatório de diferenças
+COLUNAS_COMPARADAS = ['Dias', 'VALOR DIÁRIO VR', 'TOTAL', 'Custo empresa', 'Desconto profissional']
+
+
+def impressoes_entrada(df_principal, df_competencias, admissoes_map, df_afastamentos, df_ferias, df_desligados,
+                       df_base_dias_uteis, df_base_sindicato_valor):
+    """
+    Calcula a impressão digital das entradas de cada (competência,
+    colaborador): a linha da base consolidada, a admissão, as observações
+    de afastamento, as férias e o desligamento já agregados, as bases do
+    sindicato e VERSAO_CALCULO. Se nenhuma delas mudou, o resultado gravado
+    na execução anterior continua válido.
+
+    Recebe as mesmas tabelas de referência que calcular_lote. Retorna um
+    DataFrame com 'Competência', 'Matricula' e 'impressao' (inteiro de 64
+    bits), na ordem das linhas do cálculo.
+    """
+    entrada = df_principal[[coluna for coluna in COLUNAS_PRINCIPAL if coluna in df_principal.columns]].copy()
+    entrada['admissao'] = entrada['matricula'].map(admissoes_map)
+
+    # Todas as observações da matrícula, em ordem, num único texto
+    observacoes = (
+        df_afastamentos.assign(observacao=df_afastamentos['observacao'].fillna('').astype(str))
+        .sort_values('observacao', kind='stable')
+        .groupby('matricula', observed=True, sort=False)['observacao'].agg('|'.join)
+    )
+    entrada['afastamentos'] = entrada['matricula'].map(observacoes)
+
+    entrada = mesclar_sem_expansao(entrada, df_ferias, 'matricula', 'ferias')
+    entrada = mesclar_sem_expansao(entrada, df_desligados, 'matricula', 'desligados')
+    entrada = mesclar_sem_expansao(entrada, df_base_dias_uteis, 'sindicato', 'base_dias_uteis', suffixes=('', '_bd_dias_uteis'))
+    entrada = mesclar_sem_expansao(entrada, df_base_sindicato_valor, 'sindicato', 'base_sindicato_valor', suffixes=('', '_bd_valor'))
+    entrada = pd.merge(df_competencias[['Competência']], entrada, how='cross')
+    entrada['versao_calculo'] = VERSAO_CALCULO
+
+    # Tudo como texto, para que a impressão não dependa do tipo com que cada
+    # tabela foi lida (cache ou banco)
+    impressao = pd.util.hash_pandas_object(entrada.astype(str), index=False).to_numpy().view(np.int64)
+    return pd.DataFrame({
+        'Competência': entrada['Competência'].to_numpy(),
+        'Matricula': entrada['matricula'].to_numpy(),
+        'impressao': impressao,
+    })
+
+
+def para_historico(df_resultado, impressoes, calculado_em):
+    """
+    Converte a tabela de resultados para as colunas de vr_calculado, com a
+    impressão de cada linha e o momento do cálculo.
+    """
+    df = df_resultado[list(COLUNAS_HISTORICO)].merge(
+        impressoes, on=['Competência', 'Matricula'], how='left', validate='one_to_one'
+    )
+    df = df.rename(columns=COLUNAS_HISTORICO)
+    df['calculado_em'] = calculado_em
+    return df
+
+
+def do_historico(df_historico):
+    """
+    Converte linhas lidas de vr_calculado para as colunas da tabela de
+    resultados, mantendo a coluna 'impressao'.
+    """
+    df = df_historico.rename(columns={tabela: resultado for resultado, tabela in COLUNAS_HISTORICO.items()})
+    df['Matricula'] = para_matricula(df['Matricula'])
+    df['Admissão'] = pd.to_datetime(df['Admissão'], errors='coerce')
+    df['OBS GERAL'] = df['OBS GERAL'].fillna('')
+    # Nulos (linhas sem impressão) sem converter os inteiros de 64 bits para float
+    df['impressao'] = df['impressao'].astype('Int64')
+    for coluna in COLUNAS_COMPARADAS:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype(float)
+    return df[list(COLUNAS_HISTORICO) + ['impressao']]
+
+
+def comparar_resultados(anterior, atual):
+    """
+    Compara os resultados da execução anterior com os atuais, por
+    (competência, matrícula).
+
+    Retorna uma linha por colaborador incluído, removido ou com algum valor
+    de COLUNAS_COMPARADAS diferente: 'Situação' ('incluído', 'removido' ou
+    'alterado'), as chaves e, para cada coluna, o valor anterior e o atual.
+    """
+    chaves = ['Competência', 'Matricula']
+    juntos = pd.merge(
+        anterior[chaves + COLUNAS_COMPARADAS], atual[chaves + COLUNAS_COMPARADAS],
+        on=chaves, how='outer', suffixes=(' anterior', ''), indicator=True
+    )
+    situacao = np.select(
+        [juntos['_merge'] == 'right_only', juntos['_merge'] == 'left_only'], ['incluído', 'removido'], 'alterado'
+    )
+    diferente = np.zeros(len(juntos), dtype=bool)
+    for coluna in COLUNAS_COMPARADAS:
+        antes, depois = juntos[f'{coluna} anterior'], juntos[coluna]
+        diferente |= ~((antes == depois) | (antes.isna() & depois.isna())).to_numpy()
+
+    juntos.insert(0, 'Situação', situacao)
+    colunas = ['Situação'] + chaves + [nome for coluna in COLUNAS_COMPARADAS for nome in (f'{coluna} anterior', coluna)]
+    return juntos.loc[(situacao != 'alterado') | diferente, colunas].reset_index(drop=True)
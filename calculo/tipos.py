@@ -0,0 +1,102 @@
+# File: calculo/tipos.py
+import pandas as pd
+
+# Colunas de poucos valores distintos, guardadas como categorias
+COLUNAS_CATEGORICAS = ('sindicato', 'estado', 'empresa', 'desc_situacao')
+
+
+def _texto_limpo(serie):
+    """
+    Texto sem espaços nas pontas; nulos e textos vazios viram NaN.
+    """
+    nulos = serie.isna().to_numpy()
+    texto = serie.astype(str).str.strip()
+    return texto.where(~nulos & (texto != ''))
+
+
+class DicionarioCategorias:
+    """
+    Dicionário de categorias compartilhado entre as tabelas de uma execução.
+
+    Cada coluna (sindicato, estado...) tem uma única lista de categorias, que
+    só cresce: valores novos entram no fim, então os códigos já atribuídos
+    não mudam. Tabelas codificadas pelo mesmo dicionário podem ser unidas
+    pelos códigos inteiros, sem comparar os textos.
+    """
+
+    def __init__(self):
+        self._categorias = {}
+
+    def categorias(self, coluna):
+        return self._categorias.get(coluna, pd.Index([], dtype=object))
+
+    def codificar(self, serie, coluna):
+        """
+        Converte a Series em categorias de `coluna`, incluindo no dicionário
+        os valores ainda não vistos.
+        """
+        texto = _texto_limpo(serie)
+        conhecidas = self.categorias(coluna)
+        novas = pd.Index(texto.dropna().unique(), dtype=object).difference(conhecidas, sort=False)
+        if len(novas):
+            conhecidas = conhecidas.append(novas)
+            self._categorias[coluna] = conhecidas
+        return pd.Series(pd.Categorical(texto, categories=conhecidas), index=serie.index, name=serie.name)
+
+
+def para_matricula(serie):
+    """
+    Converte matrículas para inteiros (int64, ou Int64 se houver nulos).
+
+    Se alguma matrícula não for numérica, a coluna é mantida como texto sem
+    espaços nas pontas, com um aviso; as junções com colunas inteiras passam
+    então a comparar texto (ver alinhar_chaves).
+    """
+    texto = _texto_limpo(serie)
+    numeros = pd.to_numeric(texto, errors='coerce')
+    invalidas = numeros.isna() & texto.notna()
+    if invalidas.any():
+        exemplos = texto[invalidas].unique()[:5].tolist()
+        print(f"Aviso: {int(invalidas.sum())} matrícula(s) não numérica(s), mantidas como texto (ex.: {exemplos}).")
+        return texto
+    if (numeros.dropna() % 1 != 0).any():
+        return texto
+    return numeros.astype('Int64') if numeros.isna().any() else numeros.astype('int64')
+
+
+def compactar(df, dicionario=None):
+    """
+    Converte `matricula` para inteiro e as colunas de COLUNAS_CATEGORICAS para
+    categorias do `dicionario` (um novo, se não for informado). Altera e
+    devolve o próprio DataFrame.
+    """
+    dicionario = dicionario if dicionario is not None else DicionarioCategorias()
+    if 'matricula' in df.columns:
+        df['matricula'] = para_matricula(df['matricula'])
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = dicionario.codificar(df[coluna], coluna)
+    return df
+
+
+def alinhar_chaves(esquerda, direita, colunas):
+    """
+    Deixa as colunas de junção dos dois lados com o mesmo tipo.
+
+    Categorias de dicionários diferentes são unidas (a junção então usa os
+    códigos); matrículas inteiras de um lado e texto do outro viram texto.
+    Devolve os dois DataFrames, copiados apenas se alguma coluna mudou.
+    """
+    colunas = [colunas] if isinstance(colunas, str) else list(colunas)
+    for coluna in colunas:
+        a, b = esquerda[coluna], direita[coluna]
+        if isinstance(a.dtype, pd.CategoricalDtype) and isinstance(b.dtype, pd.CategoricalDtype):
+            if not a.cat.categories.equals(b.cat.categories):
+                categorias = a.cat.categories.append(b.cat.categories.difference(a.cat.categories, sort=False))
+                esquerda = esquerda.assign(**{coluna: a.cat.set_categories(categorias)})
+                direita = direita.assign(**{coluna: b.cat.set_categories(categorias)})
+        elif pd.api.types.is_numeric_dtype(a.dtype) != pd.api.types.is_numeric_dtype(b.dtype):
+            if not isinstance(a.dtype, pd.CategoricalDtype) and not isinstance(b.dtype, pd.CategoricalDtype):
+                esquerda = esquerda.assign(**{coluna: _texto_limpo(a)})
+                direita = direita.assign(**{coluna: _texto_limpo(b)})
+    return esquerda, direita
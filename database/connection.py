@@ -0,0 +1,56 @@
+# File: database/connection.py
+import os
+import pathlib
+import sqlite3
+
+from database import tracing
+
+DB_PATH = 'database/bd.sqlite'
+
+# Aplicados a toda conexão. cache_size negativo é em KiB (64 MiB); o mmap
+# deixa as leituras de páginas a cargo do sistema operacional (256 MiB).
+READ_PRAGMAS = {
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Aplicados às conexões de escrita. Em WAL os leitores não bloqueiam o
+# escritor (nem o contrário) e, com synchronous NORMAL, o fsync acontece nos
+# checkpoints, não a cada commit. O journal_mode fica gravado no arquivo.
+WRITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+# Tempo de espera, em segundos, quando outro processo segura o lock de escrita
+BUSY_TIMEOUT = 30
+
+
+def apply_pragmas(conn, pragmas):
+    """
+    Executa um PRAGMA para cada item de `pragmas`.
+    """
+    for name, value in pragmas.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+
+
+def connect(db_path=DB_PATH, read_only=False):
+    """
+    Abre uma conexão com o banco com as configurações do projeto.
+
+    Conexões de escrita (padrão) criam o banco se ele não existir e usam
+    WAL com synchronous NORMAL. Com `read_only`, o arquivo é aberto em modo
+    somente leitura (o banco precisa existir): a conexão não pode gravar e
+    pode ler enquanto outra etapa grava. As conexões usam a classe instalada
+    pela instrumentação, quando houver (ver database/tracing.py).
+    """
+    factory = tracing.connection_factory()
+    if read_only:
+        uri = pathlib.Path(os.path.abspath(db_path)).as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT, factory=factory)
+    else:
+        conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, factory=factory)
+        apply_pragmas(conn, WRITE_PRAGMAS)
+    apply_pragmas(conn, READ_PRAGMAS)
+    return conn
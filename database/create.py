@@ -1,6 +1,20 @@
 import sqlite3
 import os
 
+from database.schema import INDEXES, SCHEMA_VERSION, migrate
+from database.connection import connect
+
+def drop_legacy_tables(cursor):
+    """
+    Remove as tabelas existentes que não declaram chave primária.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    for (table_name,) in cursor.fetchall():
+        columns = cursor.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        if not any(column[5] for column in columns):
+            cursor.execute(f'DROP TABLE "{table_name}"')
+            print(f"Tabela '{table_name}' sem chave primária removida para ser recriada.")
+
 def create_tables():
     """
     Cria as tabelas no banco de dados SQLite.
@@ -9,29 +23,57 @@ def create_tables():
     
     conn = None
     try:
-        conn = sqlite3.connect('database/bd.sqlite')
+        conn = connect()
         cursor = conn.cursor()
         
+        # Tabelas criadas por versões antigas não têm chave primária e acumulam
+        # linhas duplicadas a cada execução. Como o conteúdo vem das planilhas,
+        # elas são descartadas e recriadas com a chave declarada.
+        drop_legacy_tables(cursor)
+        
+        # Bancos de versões anteriores são atualizados antes de criar o que falta.
+        migrate(conn)
+        
         # Tabela: vr_mensal
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS vr_mensal (
                 matricula TEXT,
-                admissao TEXT,
+                admissao DATE,
                 sindicato_do_colaborador TEXT,
                 competencia TEXT,
+                dias NUMERIC,
+                valor_diario_vr NUMERIC,
+                total NUMERIC,
+                custo_empresa NUMERIC,
+                desconto_profissional NUMERIC,
+                obs_geral TEXT,
+                PRIMARY KEY (matricula, competencia)
+            )
+        ''')
+        
+        # Tabela: vr_calculado (resultados da Etapa 4, com a impressão das entradas)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vr_calculado (
+                competencia TEXT,
+                matricula TEXT,
+                admissao DATE,
+                sindicato_do_colaborador TEXT,
                 dias REAL,
                 valor_diario_vr REAL,
                 total REAL,
                 custo_empresa REAL,
                 desconto_profissional REAL,
-                obs_geral TEXT
+                obs_geral TEXT,
+                impressao INTEGER,
+                calculado_em TEXT,
+                PRIMARY KEY (competencia, matricula)
             )
         ''')
         
         # Tabela: ativos
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS ativos (
-                matricula TEXT,
+                matricula TEXT PRIMARY KEY,
                 empresa TEXT,
                 titulo_do_cargo TEXT,
                 desc_situacao TEXT,
@@ -42,17 +84,22 @@ def create_tables():
         # Tabela: admissoes
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS admissoes (
-                matricula TEXT,
-                admissao TEXT,
+                matricula TEXT PRIMARY KEY,
+                admissao DATE,
                 cargo TEXT
             )
         ''')
 
+        # Desligados, férias e afastamentos podem ter várias linhas por
+        # matrícula: a chave é o número da linha e a agregação por
+        # colaborador fica com a Etapa 4 (ver calculo/agregacao.py)
+
         # Tabela: desligados
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS desligados (
+                linha INTEGER PRIMARY KEY,
                 matricula TEXT,
-                data_demissao TEXT,
+                data_demissao DATE,
                 comunicado_de_desligamento TEXT
             )
         ''')
@@ -60,17 +107,18 @@ def create_tables():
         # Tabela: ferias
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS ferias (
+                linha INTEGER PRIMARY KEY,
                 matricula TEXT,
                 desc_situacao TEXT,
-                dias_de_ferias REAL
+                dias_de_ferias INTEGER
             )
         ''')
 
         # Tabela: exterior
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS exterior (
-                matricula TEXT,
-                valor REAL,
+                matricula TEXT PRIMARY KEY,
+                valor NUMERIC,
                 observacao TEXT
             )
         ''')
@@ -78,7 +126,7 @@ def create_tables():
         # Tabela: estagio
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS estagio (
-                matricula TEXT,
+                matricula TEXT PRIMARY KEY,
                 titulo_do_cargo TEXT,
                 na_compra TEXT
             )
@@ -87,7 +135,7 @@ def create_tables():
         # Tabela: base_dias_uteis
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS base_dias_uteis (
-                sindicato TEXT,
+                sindicato TEXT PRIMARY KEY,
                 dias_uteis INTEGER
             )
         ''')
@@ -95,8 +143,8 @@ def create_tables():
         # Tabela: base_sindicato_valor
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS base_sindicato_valor (
-                estado TEXT,
-                valor TEXT,
+                estado TEXT PRIMARY KEY,
+                valor_centavos INTEGER,
                 sindicato TEXT
             )
         ''')
@@ -104,6 +152,7 @@ def create_tables():
         # Tabela: afastamentos
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS afastamentos (
+                linha INTEGER PRIMARY KEY,
                 matricula TEXT,
                 desc_situacao TEXT,
                 observacao TEXT
@@ -113,13 +162,45 @@ def create_tables():
         # Tabela: aprendiz
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS aprendiz (
-                matricula TEXT,
+                matricula TEXT PRIMARY KEY,
                 titulo_do_cargo TEXT
             )
         ''')
         
+        # Tabela: colaboradores_elegiveis (base consolidada pela Etapa 3)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS colaboradores_elegiveis (
+                matricula TEXT PRIMARY KEY,
+                empresa TEXT,
+                titulo_do_cargo TEXT,
+                desc_situacao TEXT,
+                sindicato TEXT,
+                estado TEXT,
+                valor_centavos INTEGER,
+                dias_uteis INTEGER
+            )
+        ''')
+        
+        # Tabela: ingestion_manifest (versão de cada planilha já carregada)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingestion_manifest (
+                table_name TEXT PRIMARY KEY,
+                source_file TEXT,
+                size INTEGER,
+                mtime REAL,
+                content_hash TEXT,
+                rows INTEGER,
+                loaded_at TEXT
+            )
+        ''')
+        
+        # Índices nas chaves de junção
+        for index_sql in INDEXES:
+            cursor.execute(index_sql)
+        
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         conn.commit()
-        print("Tabelas criadas com sucesso.")
+        print(f"Tabelas criadas com sucesso (esquema versão {SCHEMA_VERSION}).")
         
     except sqlite3.Error as e:
         print(f"Erro ao criar as tabelas: {e}")
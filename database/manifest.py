@@ -0,0 +1,71 @@
+# File: database/manifest.py
+import hashlib
+import os
+from datetime import datetime
+
+def file_stat(file_path):
+    """
+    Retorna (tamanho, mtime) do arquivo.
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Calcula o SHA-256 do conteúdo do arquivo, lendo em blocos.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def check_source(conn, table_name, file_path):
+    """
+    Verifica se a planilha mudou desde a última carga da tabela.
+
+    Retorna (mudou, fingerprint). Se tamanho e mtime forem os mesmos do
+    manifesto, o arquivo nem é lido; caso contrário o hash do conteúdo
+    decide. Uma tabela vazia é sempre considerada pendente de carga.
+    """
+    size, mtime = file_stat(file_path)
+    fingerprint = {'size': size, 'mtime': mtime, 'content_hash': None}
+
+    row = conn.execute(
+        'SELECT size, mtime, content_hash FROM ingestion_manifest WHERE table_name = ?',
+        (table_name,)
+    ).fetchone()
+    has_rows = conn.execute(f'SELECT EXISTS (SELECT 1 FROM {table_name})').fetchone()[0]
+    if row is None or not has_rows:
+        fingerprint['content_hash'] = file_hash(file_path)
+        return True, fingerprint
+
+    if row[0] == size and row[1] == mtime:
+        fingerprint['content_hash'] = row[2]
+        return False, fingerprint
+
+    fingerprint['content_hash'] = file_hash(file_path)
+    return fingerprint['content_hash'] != row[2], fingerprint
+
+def record_source(conn, table_name, file_name, fingerprint, rows=None):
+    """
+    Grava no manifesto a versão da planilha carregada na tabela. Quando
+    `rows` é None (arquivo com o mesmo conteúdo e outro mtime), apenas os
+    metadados do arquivo são atualizados. Não faz commit.
+    """
+    if rows is None:
+        conn.execute(
+            'UPDATE ingestion_manifest SET source_file = ?, size = ?, mtime = ? WHERE table_name = ?',
+            (file_name, fingerprint['size'], fingerprint['mtime'], table_name)
+        )
+    else:
+        conn.execute('''
+            INSERT INTO ingestion_manifest
+                (table_name, source_file, size, mtime, content_hash, rows, loaded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (table_name) DO UPDATE SET
+                source_file = excluded.source_file, size = excluded.size,
+                mtime = excluded.mtime, content_hash = excluded.content_hash,
+                rows = excluded.rows, loaded_at = excluded.loaded_at
+        ''', (table_name, file_name, fingerprint['size'], fingerprint['mtime'],
+              fingerprint['content_hash'], rows, datetime.now().isoformat(timespec='seconds')))
@@ -0,0 +1,25 @@
+# File: database/money.py
+
+
+def to_cents(values):
+    """
+    Converte valores monetários em centavos inteiros (Int64).
+
+    Aceita números (35, 37.5) e textos com ou sem o símbolo da moeda, no
+    formato brasileiro ('R$ 1.035,50', '35,00') ou com ponto decimal
+    ('37.50'). Valores ausentes ou que não são números viram nulos.
+    """
+    # Importado aqui: o mapa de arquivos (database/sources.py) referencia
+    # esta função e é usado por comandos que não precisam do pandas
+    import pandas as pd
+
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        numbers = values.astype(float)
+    else:
+        text = values.astype(str).str.replace('R$', '', regex=False).str.replace(r'\s+', '', regex=True)
+        # Com vírgula decimal, os pontos separam milhares
+        decimal_comma = text.str.contains(',', regex=False)
+        text = text.where(~decimal_comma, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+        numbers = pd.to_numeric(text, errors='coerce').where(values.notna())
+    return (numbers * 100).round().astype('Int64')
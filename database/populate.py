@@ -2,6 +2,15 @@
 import pandas as pd
 import sqlite3
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from database.connection import connect
+from database.manifest import check_source, record_source
+from database.sources import FILE_TABLE_MAP, SOURCE_DIR, resolve_source
+from database.xlsx_reader import calamine_available, read_columns, read_columns_calamine
+from database.tracing import record, span
 
 def clean_column_name(col_name):
     """
@@ -17,101 +26,276 @@ def clean_column_name(col_name):
     col_name = col_name.replace('á', 'a')
     return col_name
 
-def populate_tables():
+def read_spreadsheet(file_name_lower, file_path, columns_by_index, engine='auto'):
     """
-    Lê os arquivos de planilhas e popula as tabelas no banco de dados.
+    Lê uma planilha e devolve o DataFrame com as colunas mapeadas por índice.
+
+    `engine` pode ser 'stream' (openpyxl somente leitura, linha a linha),
+    'calamine' (requer python-calamine), 'pandas' (pd.read_excel completo) ou
+    'auto', que usa o calamine quando instalado e o 'stream' caso contrário.
+    """
+    # A primeira linha é o cabeçalho original. Em 'base dias uteis.xlsx' ela
+    # é um título e o cabeçalho aparece como linha de dados, como antes.
+    skiprows = 1
+
+    if engine == 'auto':
+        engine = 'calamine' if calamine_available() else 'stream'
+
+    if engine == 'stream':
+        return read_columns(file_path, columns_by_index, skiprows)
+    if engine == 'calamine':
+        return read_columns_calamine(file_path, columns_by_index, skiprows)
+    if engine != 'pandas':
+        raise ValueError(f"Leitor de planilhas inválido: {engine}")
+
+    df = pd.read_excel(file_path, header=None, skiprows=skiprows)
+
+    # Renomeia as colunas com base no mapeamento por índice.
+    df = df.rename(columns=columns_by_index)
+
+    # Checa se o número de colunas está correto.
+    if len(df.columns) < len(columns_by_index):
+        for i in range(len(df.columns), len(columns_by_index)):
+            df[columns_by_index[i]] = None
+
+    # Seleciona apenas as colunas necessárias para a inserção.
+    return df[list(columns_by_index.values())]
+
+def _parse_job(job):
+    """
+    Executa read_spreadsheet em um processo de trabalho e mede o tempo gasto.
+    """
+    start = time.perf_counter()
+    df = read_spreadsheet(job['file_name_lower'], job['file_path'], job['info']['columns_by_index'], job['engine'])
+    return df, time.perf_counter() - start
+
+def parse_spreadsheets(jobs, workers=1):
+    """
+    Lê as planilhas pendentes, em paralelo quando `workers` > 1.
+
+    Gera (job, df, segundos, erro) na ordem de `jobs`; em caso de falha, `df`
+    é None e `erro` traz a exceção.
+    """
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [executor.submit(_parse_job, job) for job in jobs]
+            for job, future in zip(jobs, futures):
+                try:
+                    df, seconds = future.result()
+                    yield job, df, seconds, None
+                except Exception as e:
+                    yield job, None, 0.0, e
+    else:
+        for job in jobs:
+            try:
+                df, seconds = _parse_job(job)
+                yield job, df, seconds, None
+            except Exception as e:
+                yield job, None, 0.0, e
+
+def apply_converters(df, converters):
+    """
+    Aplica as conversões declaradas no FILE_TABLE_MAP (coluna -> função que
+    recebe e devolve a coluna inteira).
+    """
+    if not converters:
+        return df
+    df = df.copy()
+    for col, converter in converters.items():
+        df[col] = converter(df[col])
+    return df
+
+def coerce_to_schema(conn, df, table_name):
     """
-    
-    # Mapeamento de nomes de arquivos (sem diferenciação de maiúsculas/minúsculas)
-    # para nomes de tabelas e mapeamento de índice de coluna para nome final da coluna.
-    file_table_map = {
-        'vr mensal 05.2025.xlsx': {'table': 'vr_mensal', 'columns_by_index': {
-            0: 'matricula', 1: 'admissao', 2: 'sindicato_do_colaborador', 
-            3: 'competencia', 4: 'dias', 5: 'valor_diario_vr', 
-            6: 'total', 7: 'custo_empresa', 8: 'desconto_profissional', 
-            9: 'obs_geral'
-        }},
-        'ativos.xlsx': {'table': 'ativos', 'columns_by_index': {
-            0: 'matricula', 1: 'empresa', 2: 'titulo_do_cargo',
-            3: 'desc_situacao', 4: 'sindicato'
-        }},
-        'admissao abril.xlsx': {'table': 'admissoes', 'columns_by_index': {
-            0: 'matricula', 1: 'admissao', 2: 'cargo'
-        }},
-        'desligados.xlsx': {'table': 'desligados', 'columns_by_index': {
-            0: 'matricula', 1: 'data_demissao', 2: 'comunicado_de_desligamento'
-        }},
-        'ferias.xlsx': {'table': 'ferias', 'columns_by_index': {
-            0: 'matricula', 1: 'desc_situacao', 2: 'dias_de_ferias'
-        }},
-        'exterior.xlsx': {'table': 'exterior', 'columns_by_index': {
-            0: 'matricula', 1: 'valor', 2: 'observacao'
-        }},
-        'estagio.xlsx': {'table': 'estagio', 'columns_by_index': {
-            0: 'matricula', 1: 'titulo_do_cargo', 2: 'na_compra'
-        }},
-        'base dias uteis.xlsx': {'table': 'base_dias_uteis', 'columns_by_index': {
-            0: 'sindicato', 1: 'dias_uteis'
-        }},
-        'base sindicato x valor.xlsx': {'table': 'base_sindicato_valor', 'columns_by_index': {
-            0: 'estado', 1: 'valor', 2:'sindicato'
-        }},
-        'afastamentos.xlsx': {'table': 'afastamentos', 'columns_by_index': {
-            0: 'matricula', 1: 'desc_situacao', 2: 'observacao'
-        }},
-        'aprendiz.xlsx': {'table': 'aprendiz', 'columns_by_index': {
-            0: 'matricula', 1: 'titulo_do_cargo'
-        }},
+    Ajusta os valores do DataFrame aos tipos declarados na tabela.
+
+    Colunas DATE são gravadas como texto 'AAAA-MM-DD'; valores que não são
+    datas viram nulos. As colunas numéricas ficam a cargo da afinidade de
+    tipo do SQLite.
+    """
+    declared_types = {
+        row[1]: row[2].upper() for row in conn.execute(f'PRAGMA table_info("{table_name}")')
     }
+    df = df.copy()
+    for col in df.columns:
+        if declared_types.get(col) == 'DATE':
+            df[col] = pd.to_datetime(df[col], errors='coerce', format='mixed', dayfirst=True).dt.strftime('%Y-%m-%d')
+    return df
+
+def _to_sql_value(value):
+    """
+    Converte um valor do DataFrame para um tipo aceito pelo sqlite3.
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+def upsert_dataframe(conn, df, table_name, key_columns, mode='snapshot', group_columns=None):
+    """
+    Grava o DataFrame na tabela usando a chave declarada.
 
+    No modo 'snapshot' o conteúdo da tabela é substituído pelo da planilha;
+    no modo 'upsert' as linhas existentes são atualizadas pela chave e as
+    novas são inseridas. Em ambos os casos, reexecutar a carga não duplica
+    linhas. Não faz commit: a transação é controlada por quem chama.
+    Retorna o número de linhas gravadas.
+
+    Tabelas sem chave natural (`key_columns` None, com a chave pelo número
+    da linha) guardam todas as linhas, mesmo com `group_columns` repetidas
+    (várias férias de uma matrícula, por exemplo). No modo 'upsert', as
+    linhas gravadas de cada grupo presente no DataFrame são substituídas
+    pelas novas.
+    """
+    if mode not in ('snapshot', 'upsert'):
+        raise ValueError(f"Modo de carga inválido: {mode}")
+    if key_columns is None and not group_columns:
+        raise ValueError(f"A tabela '{table_name}' precisa de uma chave ou de colunas de grupo.")
+    identity_columns = key_columns if key_columns is not None else group_columns
+
+    # Linhas sem chave (linhas em branco da planilha) não podem ser identificadas
+    df = df.dropna(subset=identity_columns, how='all').copy()
+
+    # Chaves textuais gravadas sem espaços nas pontas, para que as junções no
+    # SQLite possam comparar por igualdade e usar os índices
+    for col in identity_columns:
+        df[col] = df[col].map(lambda value: value.strip() if isinstance(value, str) else value)
+
+    if key_columns is not None:
+        duplicated = df.duplicated(subset=key_columns, keep='last')
+        if duplicated.any():
+            print(f"Aviso: {duplicated.sum()} linha(s) com chave repetida em '{table_name}'. Mantida a última ocorrência.")
+            df = df[~duplicated]
+
+    columns = ', '.join(df.columns)
+    placeholders = ', '.join('?' for _ in df.columns)
+    rows = ([_to_sql_value(value) for value in row] for row in df.itertuples(index=False, name=None))
+
+    if mode == 'snapshot':
+        conn.execute(f'DELETE FROM {table_name}')
+
+    if key_columns is None:
+        if mode == 'upsert':
+            groups = ' AND '.join(f'{col} = ?' for col in group_columns)
+            conn.executemany(
+                f'DELETE FROM {table_name} WHERE {groups}',
+                ([_to_sql_value(value) for value in group] for group in
+                 df[group_columns].drop_duplicates().itertuples(index=False, name=None))
+            )
+        conn.executemany(f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})', rows)
+        return len(df)
+
+    keys = ', '.join(key_columns)
+    updates = ', '.join(f'{col} = excluded.{col}' for col in df.columns if col not in key_columns)
+    on_conflict = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+    conn.executemany(
+        f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) ON CONFLICT ({keys}) {on_conflict}',
+        rows
+    )
+
+    return len(df)
+
+def populate_tables(mode='snapshot', force=False, workers=1, engine='auto', source_dir=SOURCE_DIR):
+    """
+    Lê os arquivos de planilhas e popula as tabelas no banco de dados.
+
+    `mode` define como cada planilha é gravada: 'snapshot' (padrão) substitui
+    o conteúdo da tabela e 'upsert' atualiza/insere pela chave da tabela.
+    Planilhas sem alteração desde a última carga (ver database/manifest.py)
+    são ignoradas, a menos que `force` seja True.
+
+    Com `workers` > 1 as planilhas são lidas em paralelo por um pool de
+    processos; a gravação é feita por um único escritor, em uma só
+    transação. `engine` escolhe o leitor de planilhas (ver read_spreadsheet).
+    As planilhas são procuradas em `source_dir` sem diferenciar acentos e
+    maiúsculas/minúsculas (ver database/sources.py).
+    Retorna a lista de tempos de leitura e gravação por arquivo.
+    """
+    report = []
     conn = None
     try:
-        conn = sqlite3.connect('database/bd.sqlite')
-        
-        files_in_dir = {f.lower(): f for f in os.listdir('dados')}
-        
-        for file_name_lower, info in file_table_map.items():
+        conn = connect()
+
+        # --- 1. Seleciona as planilhas que precisam ser carregadas ---
+        jobs = []
+        for file_name_lower, info in FILE_TABLE_MAP.items():
             table_name = info['table']
-            columns_by_index = info['columns_by_index']
-            
-            if file_name_lower in files_in_dir:
-                file_name_original = files_in_dir[file_name_lower]
-                file_path = os.path.join('dados', file_name_original)
-                print(f"Processando arquivo: {file_name_original}")
-                
+
+            file_path = resolve_source(file_name_lower, source_dir)
+            if file_path is not None:
+                file_name_original = os.path.basename(file_path)
+
                 try:
-                    # CORREÇÃO: Tratar o caso específico de 'base dias uteis.xls'
-                    if file_name_lower == 'base dias uteis.xlsx':
-                        df = pd.read_excel(file_path, header=None, skiprows=1)
-                    else:
-                        df = pd.read_excel(file_path, header=None, skiprows=[0])
-                    
-                    # Renomeia as colunas com base no mapeamento por índice.
-                    df = df.rename(columns=columns_by_index)
-                    
-                    # Checa se o número de colunas está correto.
-                    if len(df.columns) < len(columns_by_index):
-                        for i in range(len(df.columns), len(columns_by_index)):
-                            df[columns_by_index[i]] = None
-                    
-                    # Seleciona apenas as colunas necessárias para a inserção.
-                    df_to_insert = df[list(columns_by_index.values())]
-                    
-                    # Insere os dados na tabela correspondente.
-                    df_to_insert.to_sql(table_name, conn, if_exists='append', index=False)
-                    print(f"Dados do arquivo '{file_name_original}' inseridos na tabela '{table_name}'. OK.")
-                
-                except Exception as e:
+                    changed, fingerprint = check_source(conn, table_name, file_path)
+                except (OSError, sqlite3.Error) as e:
                     print(f"Erro ao processar o arquivo '{file_name_original}': {e}")
+                    continue
+
+                if not changed and not force:
+                    record_source(conn, table_name, file_name_original, fingerprint)
+                    conn.commit()
+                    print(f"Arquivo sem alterações: {file_name_original}. Ignorando.")
+                    continue
+
+                jobs.append({
+                    'file_name_lower': file_name_lower, 'file_name': file_name_original,
+                    'file_path': file_path, 'info': info, 'fingerprint': fingerprint,
+                    'engine': engine,
+                })
             else:
                 print(f"Arquivo não encontrado: {file_name_lower}. Ignorando.")
 
+        # --- 2. Lê as planilhas e grava tudo em uma única transação ---
+        conn.execute('BEGIN')
+        for job, df, parse_seconds, error in parse_spreadsheets(jobs, workers):
+            file_name_original = job['file_name']
+            table_name = job['info']['table']
+            print(f"Processando arquivo: {file_name_original}")
+            if error is not None:
+                print(f"Erro ao processar o arquivo '{file_name_original}': {error}")
+                continue
+
+            # Um savepoint por arquivo: uma falha desfaz só a tabela afetada
+            start = time.perf_counter()
+            with span(table_name, 'tabela', file=file_name_original, parse_seconds=round(parse_seconds, 6)) as trecho:
+                conn.execute('SAVEPOINT arquivo')
+                try:
+                    # Grava os dados na tabela correspondente pela chave declarada.
+                    df_to_insert = coerce_to_schema(conn, apply_converters(df, job['info'].get('converters')), table_name)
+                    rows = upsert_dataframe(
+                        conn, df_to_insert, table_name, job['info']['key'], mode, job['info'].get('group')
+                    )
+                    record_source(conn, table_name, file_name_original, job['fingerprint'], rows)
+                    conn.execute('RELEASE SAVEPOINT arquivo')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO SAVEPOINT arquivo')
+                    conn.execute('RELEASE SAVEPOINT arquivo')
+                    print(f"Erro ao processar o arquivo '{file_name_original}': {e}")
+                    trecho.registrar(linhas_entrada=len(df), erro=str(e))
+                    continue
+                trecho.registrar(linhas_entrada=len(df), linhas_saida=rows)
+            insert_seconds = time.perf_counter() - start
+
+            report.append({
+                'table': table_name, 'file': file_name_original, 'rows': rows,
+                'parse_seconds': parse_seconds, 'insert_seconds': insert_seconds,
+            })
+            print(f"Dados do arquivo '{file_name_original}' gravados na tabela '{table_name}' ({rows} linhas). "
+                  f"Leitura: {parse_seconds:.2f}s, gravação: {insert_seconds:.2f}s. OK.")
+        conn.commit()
+        record(linhas_saida=sum(item['rows'] for item in report), files=len(report))
+
     except sqlite3.Error as e:
         print(f"Erro ao conectar ao banco de dados: {e}")
-        
+
     finally:
         if conn:
             conn.close()
 
+    return report
+
 if __name__ == "__main__":
     populate_tables()
@@ -0,0 +1,49 @@
+# File: database/prefetch.py
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from database.connection import DB_PATH, connect
+
+
+def read_table(table_name, db_path=DB_PATH, query=None):
+    """
+    Lê uma tabela inteira (ou o resultado de `query`) por uma conexão
+    somente leitura própria, que pode ser usada em qualquer thread.
+
+    O pandas relança os erros do SQLite (por exemplo, tabela inexistente)
+    como pandas.errors.DatabaseError; aqui eles voltam a ser
+    sqlite3.OperationalError, com o nome da tabela, para que os tratadores
+    de sqlite3.Error das etapas também cubram as leituras em paralelo.
+    """
+    conn = connect(db_path, read_only=True)
+    try:
+        return pd.read_sql_query(query or f"SELECT * FROM {table_name}", conn)
+    except pd.errors.DatabaseError as e:
+        raise sqlite3.OperationalError(f"Erro ao ler a tabela {table_name}: {e.__cause__ or e}") from e
+    finally:
+        conn.close()
+
+
+def prefetch(loaders, workers=None):
+    """
+    Executa as cargas independentes de `loaders` (nome -> função sem
+    argumentos) em paralelo, em threads, e devolve (nome, resultado) na
+    ordem em que cada uma termina, para que quem chama prepare uma tabela
+    enquanto as outras ainda estão sendo lidas.
+
+    O SQLite libera o GIL enquanto busca as linhas, então as leituras se
+    sobrepõem entre si e ao processamento na thread principal. Um erro de
+    carga é relançado ao chegar a vez daquela tabela (com read_table, como
+    sqlite3.Error); as cargas ainda não iniciadas são canceladas.
+    """
+    if not loaders:
+        return
+    executor = ThreadPoolExecutor(max_workers=workers or len(loaders), thread_name_prefix='prefetch')
+    try:
+        futures = {executor.submit(loader): name for name, loader in loaders.items()}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
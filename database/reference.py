@@ -0,0 +1,58 @@
+# File: database/reference.py
+import os
+
+import pandas as pd
+
+from database.money import to_cents
+from database.populate import upsert_dataframe
+
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'referencias')
+
+# Arquivos de correção das tabelas de referência: arquivo (CSV separado por
+# ';'), chave da tabela, mapeamento coluna do arquivo -> coluna da tabela e
+# conversões aplicadas antes da gravação.
+CORRECTIONS = {
+    'base_sindicato_valor': {
+        'file': os.path.join(REFERENCE_DIR, 'base_sindicato_valor.csv'),
+        'key': ['estado'],
+        'columns': {'estado': 'estado', 'valor': 'valor_centavos', 'sindicato': 'sindicato'},
+        'converters': {'valor_centavos': to_cents},
+    },
+}
+
+
+def read_corrections(table_name, file_path=None):
+    """
+    Lê o arquivo de correções da tabela (padrão: o de CORRECTIONS) e devolve
+    o DataFrame com as colunas da tabela e as conversões já aplicadas.
+    """
+    spec = CORRECTIONS[table_name]
+    file_path = file_path or spec['file']
+
+    df = pd.read_csv(file_path, sep=';', dtype=str, keep_default_na=False, encoding='utf-8')
+    df.columns = [column.strip().lower() for column in df.columns]
+    missing = [column for column in spec['columns'] if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes no arquivo de correções '{file_path}': {missing}")
+
+    df = df[list(spec['columns'])].rename(columns=spec['columns'])
+    for column in df.columns:
+        df[column] = df[column].str.strip()
+    for column, converter in spec.get('converters', {}).items():
+        invalid = df[column].ne('') & converter(df[column]).isna()
+        if invalid.any():
+            raise ValueError(f"Valores inválidos em '{column}' no arquivo '{file_path}': {df.loc[invalid, column].tolist()}")
+        df[column] = converter(df[column])
+    return df
+
+
+def apply_corrections(conn, table_name, file_path=None):
+    """
+    Aplica o arquivo de correções à tabela em um único upsert pela chave:
+    as linhas existentes são atualizadas e as novas, inseridas. Não faz
+    commit: a transação é controlada por quem chama. Retorna o DataFrame
+    gravado.
+    """
+    df = read_corrections(table_name, file_path)
+    upsert_dataframe(conn, df, table_name, CORRECTIONS[table_name]['key'], mode='upsert')
+    return df
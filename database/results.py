@@ -0,0 +1,45 @@
+# File: database/results.py
+import json
+
+import pandas as pd
+
+from database.populate import coerce_to_schema, upsert_dataframe
+
+# Resultados do cálculo do VR gravados pela Etapa 4 (ver database/create.py)
+RESULTS_TABLE = 'vr_calculado'
+RESULTS_KEY = ['competencia', 'matricula']
+
+
+def read_results(conn, competencias, matriculas=None, columns=None):
+    """
+    Lê os resultados gravados das `competencias`, opcionalmente só das
+    `matriculas` informadas. As listas vão como um único parâmetro JSON, sem
+    limite de tamanho. Devolve um DataFrame com as colunas da tabela (ou só
+    com `columns`).
+    """
+    selected = ', '.join(columns) if columns else '*'
+    sql = f'SELECT {selected} FROM {RESULTS_TABLE} WHERE competencia IN (SELECT value FROM json_each(?))'
+    params = [json.dumps(list(competencias))]
+    if matriculas is not None:
+        sql += ' AND matricula IN (SELECT value FROM json_each(?))'
+        params.append(json.dumps([str(matricula) for matricula in matriculas]))
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def save_results(conn, df):
+    """
+    Grava (insere ou atualiza pela chave) os resultados de `df`, que tem as
+    colunas da tabela. Não faz commit. Retorna o número de linhas gravadas.
+    """
+    df = coerce_to_schema(conn, df, RESULTS_TABLE)
+    return upsert_dataframe(conn, df, RESULTS_TABLE, RESULTS_KEY, mode='upsert')
+
+
+def delete_results(conn, keys):
+    """
+    Remove os resultados das chaves (competencia, matricula) informadas. Não faz commit.
+    """
+    conn.executemany(
+        f'DELETE FROM {RESULTS_TABLE} WHERE competencia = ? AND matricula = ?',
+        [(competencia, str(matricula)) for competencia, matricula in keys]
+    )
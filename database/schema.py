@@ -0,0 +1,142 @@
+# File: database/schema.py
+import sqlite3
+
+# Versão do esquema criada por database/create.py. Gravada em PRAGMA user_version.
+SCHEMA_VERSION = 4
+
+# Migrações aplicadas a bancos existentes, em ordem: (versão, descrição, comandos).
+# A versão 1 é o esquema com chaves primárias e colunas sem tipo definido.
+MIGRATIONS = [
+    (2, 'Colunas de data e numéricas tipadas; várias linhas por matrícula em desligados, férias e afastamentos', [
+        # vr_mensal
+        '''CREATE TABLE vr_mensal_new (
+            matricula TEXT,
+            admissao DATE,
+            sindicato_do_colaborador TEXT,
+            competencia TEXT,
+            dias NUMERIC,
+            valor_diario_vr NUMERIC,
+            total NUMERIC,
+            custo_empresa NUMERIC,
+            desconto_profissional NUMERIC,
+            obs_geral TEXT,
+            PRIMARY KEY (matricula, competencia)
+        )''',
+        '''INSERT INTO vr_mensal_new
+           SELECT matricula, date(admissao), sindicato_do_colaborador, competencia, dias,
+                  valor_diario_vr, total, custo_empresa, desconto_profissional, obs_geral
+           FROM vr_mensal''',
+        'DROP TABLE vr_mensal',
+        'ALTER TABLE vr_mensal_new RENAME TO vr_mensal',
+        # admissoes
+        'CREATE TABLE admissoes_new (matricula TEXT PRIMARY KEY, admissao DATE, cargo TEXT)',
+        'INSERT INTO admissoes_new SELECT matricula, date(admissao), cargo FROM admissoes',
+        'DROP TABLE admissoes',
+        'ALTER TABLE admissoes_new RENAME TO admissoes',
+        # Desligados, férias e afastamentos podem ter várias linhas por
+        # matrícula: a chave é o número da linha e todas as linhas são copiadas
+        # desligados
+        '''CREATE TABLE desligados_new (
+            linha INTEGER PRIMARY KEY, matricula TEXT, data_demissao DATE, comunicado_de_desligamento TEXT
+        )''',
+        '''INSERT INTO desligados_new (matricula, data_demissao, comunicado_de_desligamento)
+           SELECT matricula, date(data_demissao), comunicado_de_desligamento FROM desligados ORDER BY rowid''',
+        'DROP TABLE desligados',
+        'ALTER TABLE desligados_new RENAME TO desligados',
+        # ferias
+        'CREATE TABLE ferias_new (linha INTEGER PRIMARY KEY, matricula TEXT, desc_situacao TEXT, dias_de_ferias INTEGER)',
+        '''INSERT INTO ferias_new (matricula, desc_situacao, dias_de_ferias)
+           SELECT matricula, desc_situacao, dias_de_ferias FROM ferias ORDER BY rowid''',
+        'DROP TABLE ferias',
+        'ALTER TABLE ferias_new RENAME TO ferias',
+        # afastamentos
+        'CREATE TABLE afastamentos_new (linha INTEGER PRIMARY KEY, matricula TEXT, desc_situacao TEXT, observacao TEXT)',
+        '''INSERT INTO afastamentos_new (matricula, desc_situacao, observacao)
+           SELECT matricula, desc_situacao, observacao FROM afastamentos ORDER BY rowid''',
+        'DROP TABLE afastamentos',
+        'ALTER TABLE afastamentos_new RENAME TO afastamentos',
+        # exterior
+        'CREATE TABLE exterior_new (matricula TEXT PRIMARY KEY, valor NUMERIC, observacao TEXT)',
+        'INSERT INTO exterior_new SELECT matricula, valor, observacao FROM exterior',
+        'DROP TABLE exterior',
+        'ALTER TABLE exterior_new RENAME TO exterior',
+        # base_sindicato_valor
+        'CREATE TABLE base_sindicato_valor_new (estado TEXT PRIMARY KEY, valor NUMERIC, sindicato TEXT)',
+        'INSERT INTO base_sindicato_valor_new SELECT estado, valor, sindicato FROM base_sindicato_valor',
+        'DROP TABLE base_sindicato_valor',
+        'ALTER TABLE base_sindicato_valor_new RENAME TO base_sindicato_valor',
+    ]),
+    (3, 'Valor do sindicato em centavos inteiros', [
+        # Textos como 'R$ 35,00' (gravados pela correção antiga) e números viram centavos
+        'CREATE TABLE base_sindicato_valor_new (estado TEXT PRIMARY KEY, valor_centavos INTEGER, sindicato TEXT)',
+        '''INSERT INTO base_sindicato_valor_new
+           SELECT estado,
+                  CASE WHEN typeof(valor) = 'text'
+                       THEN CAST(ROUND(CAST(NULLIF(TRIM(REPLACE(REPLACE(valor, 'R$', ''), ',', '.')), '') AS REAL) * 100) AS INTEGER)
+                       ELSE CAST(ROUND(valor * 100) AS INTEGER)
+                  END,
+                  sindicato
+           FROM base_sindicato_valor''',
+        'DROP TABLE base_sindicato_valor',
+        'ALTER TABLE base_sindicato_valor_new RENAME TO base_sindicato_valor',
+        # Tabela derivada, recriada por database/create.py e preenchida pela Etapa 3
+        'DROP TABLE IF EXISTS colaboradores_elegiveis',
+    ]),
+    (4, 'Observação dos afastamentos lida da quarta coluna da planilha', [
+        # A observação era lida da coluna 'na compra?'. Sem linhas, a tabela
+        # é recarregada da planilha na próxima carga.
+        'DELETE FROM afastamentos',
+    ]),
+]
+
+# Índices nas colunas usadas em junções e filtros. As chaves primárias já
+# criam índices implícitos em matricula (e em sindicato/estado nas bases);
+# desligados, férias e afastamentos, com chave pela linha, têm índice próprio.
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_desligados_matricula ON desligados (matricula)',
+    'CREATE INDEX IF NOT EXISTS idx_ferias_matricula ON ferias (matricula)',
+    'CREATE INDEX IF NOT EXISTS idx_afastamentos_matricula ON afastamentos (matricula)',
+    'CREATE INDEX IF NOT EXISTS idx_ativos_sindicato ON ativos (sindicato)',
+    'CREATE INDEX IF NOT EXISTS idx_base_sindicato_valor_sindicato ON base_sindicato_valor (sindicato)',
+    'CREATE INDEX IF NOT EXISTS idx_vr_mensal_competencia ON vr_mensal (competencia)',
+]
+
+def get_schema_version(conn):
+    """
+    Retorna a versão do esquema gravada no banco.
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn):
+    """
+    Aplica as migrações pendentes, cada uma em sua própria transação.
+
+    Um banco sem versão e sem tabelas é novo e não precisa de migração; um
+    banco sem versão mas com tabelas é tratado como versão 1. Retorna a
+    versão final do esquema.
+    """
+    version = get_schema_version(conn)
+    if version == 0:
+        has_tables = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
+        ).fetchone()[0]
+        if not has_tables:
+            return version
+        version = 1
+
+    for target_version, description, statements in MIGRATIONS:
+        if target_version <= version:
+            continue
+        try:
+            conn.execute('BEGIN')
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {target_version}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        version = target_version
+        print(f"Migração {target_version} aplicada: {description}.")
+
+    return version
@@ -0,0 +1,115 @@
+# File: database/sources.py
+import os
+import unicodedata
+
+from database.money import to_cents
+
+# Diretório padrão das planilhas de entrada
+SOURCE_DIR = 'dados'
+
+# Mapeamento de nomes de arquivos (sem diferenciação de acentos e maiúsculas/minúsculas)
+# para nomes de tabelas, chave da tabela e mapeamento de índice de coluna
+# para nome final da coluna. `converters` (opcional) indica funções aplicadas
+# a colunas inteiras antes da gravação, como os valores em centavos.
+# Tabelas com `key` None aceitam várias linhas por matrícula (`group`): todas
+# as linhas da planilha são gravadas e a agregação fica com a Etapa 4.
+FILE_TABLE_MAP = {
+    'vr mensal 05.2025.xlsx': {'table': 'vr_mensal', 'key': ['matricula', 'competencia'], 'columns_by_index': {
+        0: 'matricula', 1: 'admissao', 2: 'sindicato_do_colaborador',
+        3: 'competencia', 4: 'dias', 5: 'valor_diario_vr',
+        6: 'total', 7: 'custo_empresa', 8: 'desconto_profissional',
+        9: 'obs_geral'
+    }},
+    'ativos.xlsx': {'table': 'ativos', 'key': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'empresa', 2: 'titulo_do_cargo',
+        3: 'desc_situacao', 4: 'sindicato'
+    }},
+    'admissao abril.xlsx': {'table': 'admissoes', 'key': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'admissao', 2: 'cargo'
+    }},
+    'desligados.xlsx': {'table': 'desligados', 'key': None, 'group': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'data_demissao', 2: 'comunicado_de_desligamento'
+    }},
+    'ferias.xlsx': {'table': 'ferias', 'key': None, 'group': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'desc_situacao', 2: 'dias_de_ferias'
+    }},
+    'exterior.xlsx': {'table': 'exterior', 'key': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'valor', 2: 'observacao'
+    }},
+    'estagio.xlsx': {'table': 'estagio', 'key': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'titulo_do_cargo', 2: 'na_compra'
+    }},
+    'base dias uteis.xlsx': {'table': 'base_dias_uteis', 'key': ['sindicato'], 'columns_by_index': {
+        0: 'sindicato', 1: 'dias_uteis'
+    }},
+    'base sindicato x valor.xlsx': {'table': 'base_sindicato_valor', 'key': ['estado'], 'columns_by_index': {
+        0: 'estado', 1: 'valor_centavos', 2:'sindicato'
+    }, 'converters': {'valor_centavos': to_cents}},
+    # A terceira coluna ('na compra?') não é usada; a observação, com as datas
+    # do afastamento, é a quarta
+    'afastamentos.xlsx': {'table': 'afastamentos', 'key': None, 'group': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'desc_situacao', 3: 'observacao'
+    }},
+    'aprendiz.xlsx': {'table': 'aprendiz', 'key': ['matricula'], 'columns_by_index': {
+        0: 'matricula', 1: 'titulo_do_cargo'
+    }},
+}
+
+# Índices já montados: diretório -> (mtime do diretório, índice)
+_indexes = {}
+
+
+def normalize_name(file_name):
+    """
+    Nome do arquivo sem acentos, sem espaços nas pontas e em minúsculas,
+    usado para comparar nomes como 'FÉRIAS.xlsx' e 'ferias.xlsx'.
+    """
+    decomposed = unicodedata.normalize('NFD', str(file_name))
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return unicodedata.normalize('NFC', without_accents).strip().casefold()
+
+
+def source_index(directory=SOURCE_DIR):
+    """
+    Índice nome normalizado -> nome real dos arquivos do diretório.
+
+    O índice é montado uma vez e reaproveitado enquanto o mtime do
+    diretório não mudar (criar, remover ou renomear um arquivo muda o mtime).
+    Quando dois arquivos têm o mesmo nome normalizado, vale o primeiro em
+    ordem alfabética, com um aviso. Um diretório inexistente tem índice vazio.
+    """
+    directory = os.path.abspath(directory)
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return {}
+
+    cached = _indexes.get(directory)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    index = {}
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if not entry.is_file():
+                continue
+            key = normalize_name(entry.name)
+            if key in index:
+                print(f"Aviso: '{entry.name}' e '{index[key]}' têm o mesmo nome sem acentos; usando '{index[key]}'.")
+                continue
+            index[key] = entry.name
+
+    _indexes[directory] = (mtime, index)
+    return index
+
+
+def resolve_source(file_name, directory=SOURCE_DIR):
+    """
+    Caminho do arquivo do diretório cujo nome, sem acentos e sem diferenciar
+    maiúsculas de minúsculas, é `file_name`; None se não houver. Nada é
+    renomeado no disco.
+    """
+    real_name = source_index(directory).get(normalize_name(file_name))
+    if real_name is None:
+        return None
+    return os.path.join(directory, real_name)
@@ -0,0 +1,67 @@
+# File: database/tracing.py
+"""
+Ganchos pelos quais o pacote database informa a instrumentação do pipeline
+sem importá-la.
+
+Por padrão as conexões são conexões sqlite3 comuns e os trechos não medem
+nada. O instrumentacao.py instala aqui a sua classe de conexão medida e as
+suas funções de trecho quando é importado (ver install).
+"""
+import sqlite3
+from contextlib import nullcontext
+
+
+class _SpanInativo:
+    """Trecho usado quando não há instrumentação ativa: não mede nada."""
+
+    def registrar(self, linhas_entrada=None, linhas_saida=None, **atributos):
+        pass
+
+
+_SPAN_INATIVO = _SpanInativo()
+
+_connection_factory = sqlite3.Connection
+_span = None
+_record = None
+
+
+def install(connection_factory=None, span_function=None, record_function=None):
+    """
+    Instala os ganchos da instrumentação: a subclasse de sqlite3.Connection
+    usada por database.connection.connect, a função que abre um trecho
+    (span(nome, categoria, **atributos), usada como gerenciador de contexto)
+    e a função que anota linhas e atributos no trecho aberto mais interno.
+    Ganchos passados como None mantêm o valor atual.
+    """
+    global _connection_factory, _span, _record
+    if connection_factory is not None:
+        _connection_factory = connection_factory
+    if span_function is not None:
+        _span = span_function
+    if record_function is not None:
+        _record = record_function
+
+
+def connection_factory():
+    """
+    Classe de conexão passada ao sqlite3.connect.
+    """
+    return _connection_factory
+
+
+def span(name, category='etapa', **attributes):
+    """
+    Abre um trecho na instrumentação instalada; sem ela, o bloco roda
+    normalmente e o `registrar` do trecho não faz nada.
+    """
+    if _span is None:
+        return nullcontext(_SPAN_INATIVO)
+    return _span(name, category, **attributes)
+
+
+def record(linhas_entrada=None, linhas_saida=None, **attributes):
+    """
+    Anota linhas e atributos no trecho aberto mais interno, se houver.
+    """
+    if _record is not None:
+        _record(linhas_entrada, linhas_saida, **attributes)
@@ -0,0 +1,73 @@
+# File: database/xlsx_reader.py
+import importlib.util
+
+import pandas as pd
+
+# Textos tratados como nulos, os mesmos que o pd.read_excel reconhece por padrão
+NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+def calamine_available():
+    """
+    Indica se o leitor python-calamine (mais rápido, opcional) está instalado.
+    """
+    return importlib.util.find_spec('python_calamine') is not None
+
+def _normalize_value(value):
+    """
+    Converte o valor da célula como o pd.read_excel faz: floats inteiros viram
+    int e os textos de NA_VALUES viram nulos.
+    """
+    if isinstance(value, str) and value in NA_VALUES:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def read_columns(file_path, columns_by_index, skiprows=1):
+    """
+    Lê a primeira planilha do arquivo linha a linha, em modo somente leitura,
+    guardando apenas as colunas de `columns_by_index`.
+
+    O openpyxl em modo read_only não monta o modelo de objetos da planilha
+    inteira, então a memória usada é a das colunas selecionadas. Assim como o
+    pd.read_excel, linhas vazias no fim da planilha são descartadas e colunas
+    que não existem no arquivo ficam nulas.
+    """
+    indexes = sorted(columns_by_index)
+    data = {columns_by_index[i]: [] for i in indexes}
+    pending_empty_rows = 0
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(min_row=skiprows + 1, values_only=True):
+            if all(value is None for value in row):
+                # Só entra no resultado se aparecer outra linha com dados depois
+                pending_empty_rows += 1
+                continue
+            for _ in range(pending_empty_rows):
+                for values in data.values():
+                    values.append(None)
+            pending_empty_rows = 0
+
+            for i in indexes:
+                value = row[i] if i < len(row) else None
+                data[columns_by_index[i]].append(_normalize_value(value))
+    finally:
+        workbook.close()
+
+    return pd.DataFrame(data)
+
+def read_columns_calamine(file_path, columns_by_index, skiprows=1):
+    """
+    Lê a planilha com o motor calamine do pandas e seleciona as colunas por índice.
+    """
+    df = pd.read_excel(file_path, header=None, skiprows=skiprows, engine='calamine')
+    for i in range(len(df.columns), max(columns_by_index) + 1):
+        df[i] = None
+    return df[sorted(columns_by_index)].rename(columns=columns_by_index)
@@ -0,0 +1,314 @@
+# File: instrumentacao.py
+import cProfile
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from database import tracing
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Variáveis de ambiente que ativam a instrumentação nos scripts das etapas
+VARIAVEL_METRICAS = 'VR_METRICAS'
+VARIAVEL_PERFIL = 'VR_PERFIL'
+
+# Instrumentação ativa no processo (ver Instrumentacao.__enter__)
+_ativa = None
+
+
+def pico_rss_mb():
+    """
+    Pico de memória residente do processo até agora, em MB (None se indisponível).
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+class Span:
+    """
+    Trecho medido do pipeline: uma etapa, uma tabela ou uma fase do cálculo.
+
+    Registra tempo de relógio e de CPU, linhas de entrada e saída, o tempo
+    gasto em chamadas ao SQLite feitas por conexões medidas (ConexaoMedida) e
+    o pico de memória do processo ao final. Atributos extras vão em `atributos`.
+    """
+
+    def __init__(self, nome, categoria, atributos, pai=None):
+        self.nome = nome
+        self.categoria = categoria
+        self.atributos = dict(atributos)
+        self.pai = pai
+        self.linhas_entrada = None
+        self.linhas_saida = None
+        self.sqlite_segundos = 0.0
+        self.sqlite_chamadas = 0
+        self.segundos = None
+        self.segundos_cpu = None
+        self.pico_rss_mb = None
+        self._inicio = None
+        self._inicio_cpu = None
+
+    def registrar(self, linhas_entrada=None, linhas_saida=None, **atributos):
+        """
+        Anota linhas de entrada/saída e atributos extras no trecho.
+        """
+        if linhas_entrada is not None:
+            self.linhas_entrada = int(linhas_entrada)
+        if linhas_saida is not None:
+            self.linhas_saida = int(linhas_saida)
+        self.atributos.update(atributos)
+
+    def _iniciar(self):
+        self._inicio = time.perf_counter()
+        self._inicio_cpu = time.thread_time()
+
+    def _encerrar(self):
+        self.segundos = time.perf_counter() - self._inicio
+        self.segundos_cpu = time.thread_time() - self._inicio_cpu
+        self.pico_rss_mb = pico_rss_mb()
+
+    def como_dict(self):
+        return {
+            'nome': self.nome,
+            'categoria': self.categoria,
+            'pai': self.pai.nome if self.pai is not None else None,
+            'segundos': round(self.segundos, 6),
+            'segundos_cpu': round(self.segundos_cpu, 6),
+            'linhas_entrada': self.linhas_entrada,
+            'linhas_saida': self.linhas_saida,
+            'sqlite_segundos': round(self.sqlite_segundos, 6),
+            'sqlite_chamadas': self.sqlite_chamadas,
+            'pico_rss_mb': round(self.pico_rss_mb, 2) if self.pico_rss_mb is not None else None,
+            'atributos': self.atributos,
+        }
+
+
+class Instrumentacao:
+    """
+    Coleta os trechos medidos enquanto estiver ativa (bloco `with`).
+
+    `destino` é o arquivo de saída: com `formato` 'jsonl' cada trecho vira uma
+    linha JSON ao terminar; com 'chrome' é gravado ao final um arquivo no
+    formato Trace Event, que abre no chrome://tracing ou no Perfetto. Sem
+    `formato`, arquivos .json usam 'chrome' e os demais 'jsonl'.
+
+    `perfil` (opcional) é um arquivo .prof gravado pelo cProfile com o perfil
+    de todo o bloco, para abrir com pstats ou snakeviz. Perfis por amostragem
+    (py-spy) não precisam de gancho: basta rodar o script sob o py-spy.
+    """
+
+    def __init__(self, destino=None, formato=None, perfil=None):
+        if formato is None:
+            formato = 'chrome' if destino and destino.endswith('.json') else 'jsonl'
+        if formato not in ('jsonl', 'chrome'):
+            raise ValueError(f"Formato de métricas desconhecido: {formato}. Use 'jsonl' ou 'chrome'.")
+        self.destino = destino
+        self.formato = formato
+        self.perfil = perfil
+        self.spans = []
+        self._pilhas = threading.local()
+        self._lock = threading.Lock()
+        self._arquivo = None
+        self._profiler = None
+        self._origem = None
+        self._anterior = None
+
+    def _pilha(self):
+        if not hasattr(self._pilhas, 'spans'):
+            self._pilhas.spans = []
+        return self._pilhas.spans
+
+    def span_atual(self):
+        pilha = self._pilha()
+        return pilha[-1] if pilha else None
+
+    @contextmanager
+    def span(self, nome, categoria='etapa', **atributos):
+        pilha = self._pilha()
+        trecho = Span(nome, categoria, atributos, pilha[-1] if pilha else None)
+        trecho.atributos.setdefault('thread', threading.current_thread().name)
+        inicio_relativo = time.perf_counter() - self._origem
+        pilha.append(trecho)
+        trecho._iniciar()
+        try:
+            yield trecho
+        finally:
+            trecho._encerrar()
+            pilha.pop()
+            # O tempo de SQLite do trecho também conta para o trecho pai
+            if trecho.pai is not None:
+                trecho.pai.sqlite_segundos += trecho.sqlite_segundos
+                trecho.pai.sqlite_chamadas += trecho.sqlite_chamadas
+            self._registrar(trecho, inicio_relativo)
+
+    def _registrar(self, trecho, inicio_relativo):
+        with self._lock:
+            self.spans.append((trecho, inicio_relativo, threading.get_ident()))
+            if self._arquivo is not None and self.formato == 'jsonl':
+                registro = trecho.como_dict()
+                registro['inicio'] = round(inicio_relativo, 6)
+                self._arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                self._arquivo.flush()
+
+    def eventos_chrome(self):
+        """
+        Converte os trechos para eventos completos ('X') do formato Trace Event.
+        """
+        eventos = []
+        for trecho, inicio_relativo, thread in self.spans:
+            registro = trecho.como_dict()
+            eventos.append({
+                'name': trecho.nome,
+                'cat': trecho.categoria,
+                'ph': 'X',
+                'ts': round(inicio_relativo * 1e6, 1),
+                'dur': round(trecho.segundos * 1e6, 1),
+                'pid': os.getpid(),
+                'tid': thread,
+                'args': {chave: valor for chave, valor in registro.items() if chave not in ('nome', 'categoria')},
+            })
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+    def __enter__(self):
+        global _ativa
+        self._origem = time.perf_counter()
+        if self.destino and self.formato == 'jsonl':
+            self._arquivo = open(self.destino, 'w', encoding='utf-8')
+        if self.perfil:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._anterior, _ativa = _ativa, self
+        return self
+
+    def __exit__(self, *exc):
+        global _ativa
+        _ativa = self._anterior
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.perfil)
+            print(f"Perfil do cProfile salvo em: {self.perfil}")
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        elif self.destino and self.formato == 'chrome':
+            with open(self.destino, 'w', encoding='utf-8') as f:
+                json.dump(self.eventos_chrome(), f, ensure_ascii=False)
+        if self.destino:
+            print(f"Métricas salvas em: {self.destino}")
+        return False
+
+
+def ativa():
+    """
+    Instrumentação ativa no processo, ou None.
+    """
+    return _ativa
+
+
+def span(nome, categoria='etapa', **atributos):
+    """
+    Mede um trecho na instrumentação ativa. Sem instrumentação ativa, o bloco
+    roda normalmente e `registrar` não faz nada.
+
+        with span('consolidacao') as trecho:
+            ...
+            trecho.registrar(linhas_saida=len(df))
+    """
+    if _ativa is None:
+        # O trecho inerte é o mesmo do pacote database (ver database/tracing.py)
+        return nullcontext(tracing._SPAN_INATIVO)
+    return _ativa.span(nome, categoria, **atributos)
+
+
+def registrar(linhas_entrada=None, linhas_saida=None, **atributos):
+    """
+    Anota linhas e atributos no trecho aberto mais interno da thread atual
+    (por exemplo, o trecho da etapa aberto por quem chamou a função).
+    """
+    trecho = _ativa.span_atual() if _ativa is not None else None
+    if trecho is not None:
+        trecho.registrar(linhas_entrada, linhas_saida, **atributos)
+
+
+def do_ambiente():
+    """
+    Instrumentação configurada pelas variáveis VR_METRICAS (arquivo de
+    métricas) e VR_PERFIL (arquivo do cProfile), para uso nos scripts das
+    etapas. Sem nenhuma delas, devolve um contexto que não faz nada.
+    """
+    destino = os.environ.get(VARIAVEL_METRICAS)
+    perfil = os.environ.get(VARIAVEL_PERFIL)
+    if not destino and not perfil:
+        return nullcontext()
+    return Instrumentacao(destino or None, perfil=perfil or None)
+
+
+def _medir_sqlite(funcao, *args):
+    instrumentacao = _ativa
+    trecho = instrumentacao.span_atual() if instrumentacao is not None else None
+    if trecho is None:
+        return funcao(*args)
+    inicio = time.perf_counter()
+    try:
+        return funcao(*args)
+    finally:
+        trecho.sqlite_segundos += time.perf_counter() - inicio
+        trecho.sqlite_chamadas += 1
+
+
+class CursorMedido(sqlite3.Cursor):
+    """Cursor que soma o tempo de execução e leitura ao trecho atual."""
+
+    def execute(self, *args):
+        return _medir_sqlite(super().execute, *args)
+
+    def executemany(self, *args):
+        return _medir_sqlite(super().executemany, *args)
+
+    def executescript(self, *args):
+        return _medir_sqlite(super().executescript, *args)
+
+    def fetchone(self):
+        return _medir_sqlite(super().fetchone)
+
+    def fetchmany(self, *args):
+        return _medir_sqlite(super().fetchmany, *args)
+
+    def fetchall(self):
+        return _medir_sqlite(super().fetchall)
+
+
+class ConexaoMedida(sqlite3.Connection):
+    """Conexão cujos cursores e commits somam o tempo gasto no SQLite ao trecho atual."""
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def executescript(self, *args):
+        return self.cursor().executescript(*args)
+
+    def commit(self):
+        return _medir_sqlite(super().commit)
+
+
+# O pacote database não importa este módulo: as conexões abertas por
+# database.connection.connect passam a ser medidas (ConexaoMedida; fora de um
+# trecho medido, ela se comporta como uma conexão comum) e a carga abre seus
+# trechos por aqui (ver database/tracing.py)
+tracing.install(connection_factory=ConexaoMedida, span_function=span, record_function=registrar)
@@ -0,0 +1,149 @@
+# File: pipeline.py
+import os
+import threading
+import time
+from contextlib import nullcontext
+from graphlib import TopologicalSorter
+
+import pandas as pd
+
+import database.create
+import database.populate
+import instrumentacao
+from calculo.tipos import DicionarioCategorias, compactar
+from database.prefetch import read_table
+from Etapa0_Preparacao import check_sources
+from Etapa2_Corrige import corrigir_base_sindicato
+from Etapa3_consolidar_filtrar import consolidar_e_filtrar_dados
+from Etapa4_Calcular import calcular_vr
+
+DB_PATH = './database/bd.sqlite'
+
+# Colunas convertidas uma única vez ao carregar as tabelas no cache
+COLUNAS_DATA = ('admissao', 'data_demissao')
+
+
+class TabelaCache:
+    """
+    Cache em memória das tabelas do banco, compartilhado entre as etapas.
+
+    Cada tabela é lida uma única vez; as colunas de data são convertidas para
+    datetime, a matrícula para inteiro e sindicato, estado, empresa e situação
+    para categorias de um dicionário único (`categorias`), compartilhado por
+    todas as tabelas (ver calculo/tipos.py). `get` devolve uma cópia, para que
+    uma etapa não altere os dados vistos pelas outras.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.categorias = DicionarioCategorias()
+        self._tabelas = {}
+        self.leituras = {}
+        # A leitura pode acontecer em várias threads ao mesmo tempo (ver
+        # database/prefetch.py); a conversão, que altera o dicionário de
+        # categorias, é feita uma tabela por vez
+        self._lock = threading.Lock()
+
+    def get(self, nome):
+        with self._lock:
+            df = self._tabelas.get(nome)
+        if df is None:
+            with instrumentacao.span(f'ler {nome}', 'tabela', origem='cache') as trecho:
+                df = read_table(nome, self.db_path)
+                trecho.registrar(linhas_saida=len(df))
+
+            with self._lock:
+                if nome not in self._tabelas:
+                    for coluna in COLUNAS_DATA:
+                        if coluna in df.columns:
+                            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+                    compactar(df, self.categorias)
+
+                    self._tabelas[nome] = df
+                    self.leituras[nome] = self.leituras.get(nome, 0) + 1
+                df = self._tabelas[nome]
+        return df.copy()
+
+    def invalidar(self, *nomes):
+        """
+        Descarta as tabelas informadas (ou todas) após uma etapa que grava no banco.
+        """
+        for nome in (nomes or list(self._tabelas)):
+            self._tabelas.pop(nome, None)
+
+
+def executar_pipeline(etapas=None, modo_consolidacao='sql', workers=1, competencias=None, empresas=None, saidas_extras=None,
+                      metricas=None, perfil=None, tamanho_lote=None, incremental=False):
+    """
+    Executa as etapas do cálculo do VR em um único processo, na ordem dada
+    pelas dependências, compartilhando um cache de tabelas.
+
+    `etapas` restringe a execução a um subconjunto (as dependências não são
+    incluídas automaticamente). `competencias`, `empresas`, `saidas_extras`,
+    `tamanho_lote` e `incremental` são repassadas ao cálculo (ver calcular_vr). Retorna o relatório de tempos por etapa.
+
+    `metricas` grava os trechos medidos de cada etapa e tabela (JSON lines,
+    ou Trace Event se terminar em .json) e `perfil` grava o perfil do
+    cProfile de toda a execução (ver instrumentacao.py).
+    """
+    cache = TabelaCache()
+    resultados = {}
+
+    def preparacao():
+        check_sources()
+
+    def carga():
+        database.create.create_tables()
+        database.populate.populate_tables(workers=workers)
+        cache.invalidar()
+
+    def correcao():
+        corrigir_base_sindicato()
+        cache.invalidar('base_sindicato_valor')
+
+    def consolidacao():
+        resultados['consolidacao'] = consolidar_e_filtrar_dados(modo=modo_consolidacao, tabelas=cache)
+
+    def calculo():
+        resultados['calculo'] = calcular_vr(
+            resultados.get('consolidacao'), tabelas=cache, competencias=competencias, empresas=empresas,
+            saidas_extras=saidas_extras, tamanho_lote=tamanho_lote,
+            incremental=incremental
+        )
+
+    # Etapa: (função, dependências)
+    dag = {
+        'preparacao': (preparacao, []),
+        'carga': (carga, ['preparacao']),
+        'correcao': (correcao, ['carga']),
+        'consolidacao': (consolidacao, ['correcao']),
+        'calculo': (calculo, ['consolidacao']),
+    }
+    selecionadas = set(etapas or dag)
+
+    relatorio = []
+    ordem = TopologicalSorter({nome: deps for nome, (_, deps) in dag.items()}).static_order()
+    coleta = instrumentacao.Instrumentacao(metricas, perfil=perfil) if metricas or perfil else nullcontext()
+    with coleta:
+        for nome in ordem:
+            if nome not in selecionadas:
+                continue
+            print(f"\n=== Etapa: {nome} ===")
+            inicio = time.perf_counter()
+            with instrumentacao.span(nome):
+                dag[nome][0]()
+            relatorio.append({'etapa': nome, 'segundos': time.perf_counter() - inicio})
+
+    print("\n--- Tempo por etapa ---")
+    for item in relatorio:
+        print(f"{item['etapa']:<14} {item['segundos']:8.2f} s")
+    print(f"{'total':<14} {sum(item['segundos'] for item in relatorio):8.2f} s")
+    print(f"Tabelas lidas do banco: {cache.leituras}")
+
+    return relatorio
+
+
+if __name__ == "__main__":
+    executar_pipeline(
+        metricas=os.environ.get(instrumentacao.VARIAVEL_METRICAS), perfil=os.environ.get(instrumentacao.VARIAVEL_PERFIL)
+    )
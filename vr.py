@@ -0,0 +1,208 @@
+# File: vr.py
+"""
+Linha de comando única das etapas do cálculo do VR.
+
+Uso: python vr.py <comando> [opções]   (python vr.py -h lista os comandos)
+
+Este módulo importa só a biblioteca padrão. Os módulos das etapas, e com
+eles o pandas, são importados quando o comando roda, e apenas os que o
+comando usa: consultar um colaborador ou listar os arquivos de entrada não
+carrega o pandas. Comandos que leem o banco verificam se ele existe antes de
+importar qualquer coisa.
+
+ORCAMENTO_INICIO_MS é o tempo máximo aceito, por comando, entre o início do
+interpretador e o início do trabalho (importações incluídas), medido por
+benchmarks/bench_inicio.py. VR_METRICAS e VR_PERFIL ativam a coleta de
+métricas, como nos scripts das etapas (ver instrumentacao.py).
+"""
+import argparse
+import importlib
+import os
+import sqlite3
+import sys
+
+DB_PATH = './database/bd.sqlite'
+
+# Orçamento de inicialização de cada comando, em milissegundos
+ORCAMENTO_INICIO_MS = {
+    'fontes': 100,
+    'criar': 100,
+    'colaborador': 100,
+    'carregar': 750,
+    'corrigir': 750,
+    'consolidar': 750,
+    'calcular': 750,
+    'exportar': 750,
+    'pipeline': 800,
+}
+
+
+def _fontes(modulos, args):
+    modulos['Etapa0_Preparacao'].check_sources(args.diretorio)
+
+
+def _criar(modulos, args):
+    modulos['database.create'].create_tables()
+
+
+def _carregar(modulos, args):
+    modulos['database.create'].create_tables()
+    modulos['database.populate'].populate_tables(
+        mode=args.modo, force=args.forcar, workers=args.workers, engine=args.leitor, source_dir=args.diretorio
+    )
+
+
+def _corrigir(modulos, args):
+    modulos['Etapa2_Corrige'].corrigir_base_sindicato(args.arquivo)
+
+
+def _consolidar(modulos, args):
+    modulos['Etapa3_consolidar_filtrar'].consolidar_e_filtrar_dados(modo=args.modo, exportar_csv=args.csv)
+
+
+def _calcular(modulos, args):
+    modulos['Etapa4_Calcular'].calcular_vr(
+        competencias=args.competencia, empresas=args.empresa, particionar=args.particionar,
+        saidas_extras=args.saida, tamanho_lote=args.lote, incremental=args.incremental
+    )
+
+
+def _exportar(modulos, args):
+    modulos['Etapa4_Calcular'].exportar_resultados(
+        competencias=args.competencia, particionar=args.particionar, saidas_extras=args.saida
+    )
+
+
+def _colaborador(modulos, args):
+    conn = modulos['database.connection'].connect(DB_PATH, read_only=True)
+    try:
+        elegivel = conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM colaboradores_elegiveis WHERE matricula = ?)", (args.matricula,)
+        ).fetchone()[0]
+        sql = "SELECT * FROM vr_calculado WHERE matricula = ?"
+        params = [args.matricula]
+        if args.competencia:
+            sql += f" AND competencia IN ({', '.join('?' * len(args.competencia))})"
+            params += args.competencia
+        cursor = conn.execute(sql + " ORDER BY competencia", params)
+        colunas = [descricao[0] for descricao in cursor.description]
+        linhas = cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Erro ao consultar o colaborador: {e}")
+        return
+    finally:
+        conn.close()
+
+    print(f"Matrícula {args.matricula}: {'elegível' if elegivel else 'não elegível'} na última consolidação.")
+    if not linhas:
+        print("Nenhum resultado gravado (os resultados são gravados pelo cálculo com --incremental).")
+    for linha in linhas:
+        print()
+        for coluna, valor in zip(colunas, linha):
+            print(f"  {coluna:<26} {valor}")
+
+
+def _pipeline(modulos, args):
+    pipeline = modulos['pipeline']
+    pipeline.executar_pipeline(
+        etapas=args.etapas, modo_consolidacao=args.modo, workers=args.workers, competencias=args.competencia,
+        empresas=args.empresa, saidas_extras=args.saida, tamanho_lote=args.lote, incremental=args.incremental,
+        metricas=os.environ.get('VR_METRICAS'), perfil=os.environ.get('VR_PERFIL')
+    )
+
+
+# comando -> (módulos importados, função, usa o banco existente, ajuda)
+COMANDOS = {
+    'fontes': (['Etapa0_Preparacao'], _fontes, False, "Mostra o arquivo de entrada encontrado para cada tabela"),
+    'criar': (['database.create'], _criar, False, "Cria ou atualiza as tabelas do banco"),
+    'carregar': (['database.create', 'database.populate'], _carregar, False, "Cria as tabelas e carrega as planilhas"),
+    'corrigir': (['Etapa2_Corrige'], _corrigir, True, "Aplica as correções da base de sindicatos"),
+    'consolidar': (['Etapa3_consolidar_filtrar'], _consolidar, True, "Consolida e filtra os colaboradores elegíveis"),
+    'calcular': (['Etapa4_Calcular'], _calcular, True, "Calcula o VR e exporta os resultados"),
+    'exportar': (['Etapa4_Calcular'], _exportar, True, "Exporta os resultados gravados sem recalcular"),
+    'colaborador': (['database.connection'], _colaborador, True, "Mostra os resultados gravados de uma matrícula"),
+    'pipeline': (['pipeline'], _pipeline, False, "Executa todas as etapas em um único processo"),
+}
+
+
+def importar(comando):
+    """
+    Importa os módulos usados por `comando` e os devolve em um dicionário
+    nome -> módulo.
+    """
+    return {nome: importlib.import_module(nome) for nome in COMANDOS[comando][0]}
+
+
+def _opcoes_calculo(parser):
+    parser.add_argument('--competencia', action='append', help="Competência MM/AAAA (pode ser repetida)")
+    parser.add_argument('--empresa', action='append', help="Restringe o cálculo a este código de empresa (pode ser repetida)")
+    parser.add_argument('--saida', action='append', choices=['csv', 'parquet'], help="Cópia extra dos resultados")
+    parser.add_argument('--lote', type=int, help="Calcula em lotes deste número de colaboradores")
+    parser.add_argument('--incremental', action='store_true', help="Recalcula só os colaboradores cujas entradas mudaram")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='vr.py', description="Cálculo do VR: etapas em linha de comando.")
+    comandos = parser.add_subparsers(dest='comando', required=True, metavar='comando')
+    subparsers = {nome: comandos.add_parser(nome, help=ajuda, description=ajuda)
+                  for nome, (_, _, _, ajuda) in COMANDOS.items()}
+
+    subparsers['fontes'].add_argument('--diretorio', default='dados', help="Diretório das planilhas (padrão: dados)")
+
+    carregar = subparsers['carregar']
+    carregar.add_argument('--diretorio', default='dados', help="Diretório das planilhas (padrão: dados)")
+    carregar.add_argument('--modo', choices=['snapshot', 'upsert'], default='snapshot')
+    carregar.add_argument('--forcar', action='store_true', help="Carrega também as planilhas sem alteração")
+    carregar.add_argument('--workers', type=int, default=1, help="Processos de leitura das planilhas")
+    carregar.add_argument('--leitor', choices=['auto', 'stream', 'calamine', 'pandas'], default='auto')
+
+    subparsers['corrigir'].add_argument('--arquivo', help="Arquivo de correções (padrão: o de database/referencias)")
+
+    consolidar = subparsers['consolidar']
+    consolidar.add_argument('--modo', choices=['sql', 'pandas'], default='sql')
+    consolidar.add_argument('--csv', action='store_true', help="Exporta também a base consolidada em CSV")
+
+    calcular = subparsers['calcular']
+    _opcoes_calculo(calcular)
+    calcular.add_argument('--particionar', action='store_true', help="Um arquivo por competência")
+
+    exportar = subparsers['exportar']
+    exportar.add_argument('--competencia', action='append', help="Competência MM/AAAA (pode ser repetida)")
+    exportar.add_argument('--saida', action='append', choices=['csv', 'parquet'], help="Cópia extra dos resultados")
+    exportar.add_argument('--particionar', action='store_true', help="Um arquivo por competência")
+
+    colaborador = subparsers['colaborador']
+    colaborador.add_argument('matricula')
+    colaborador.add_argument('--competencia', action='append', help="Competência MM/AAAA (pode ser repetida)")
+
+    pipeline = subparsers['pipeline']
+    _opcoes_calculo(pipeline)
+    pipeline.add_argument('--etapas', nargs='+', choices=['preparacao', 'carga', 'correcao', 'consolidacao', 'calculo'])
+    pipeline.add_argument('--modo', choices=['sql', 'pandas'], default='sql', help="Modo da consolidação")
+    pipeline.add_argument('--workers', type=int, default=1, help="Processos de leitura das planilhas")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    _, funcao, usa_banco, _ = COMANDOS[args.comando]
+
+    if usa_banco and not os.path.exists(DB_PATH):
+        print(f"Erro: O arquivo de banco de dados não foi encontrado em {DB_PATH}")
+        return 1
+
+    modulos = importar(args.comando)
+    if args.comando == 'pipeline':
+        # O pipeline abre a própria coleta de métricas
+        funcao(modulos, args)
+        return 0
+
+    import instrumentacao
+
+    with instrumentacao.do_ambiente(), instrumentacao.span(args.comando):
+        funcao(modulos, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())